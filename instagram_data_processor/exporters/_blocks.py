@@ -0,0 +1,69 @@
+"""
+Block-wise rendering shared by the exporters that write conversations as text.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+# Number of messages whose output is collected before writing it to the file
+MESSAGES_PER_WRITE = 1000
+
+# Buffer size of the output files (1 MB), so large exports need fewer write calls
+WRITE_BUFFER_SIZE = 1 << 20
+
+def iter_message_blocks(messages):
+    """
+    Split messages into blocks of MESSAGES_PER_WRITE.
+
+    Args:
+        messages (iterable): Processed messages, as a list or a generator
+
+    Yields:
+        tuple: The block as a list, and the date of the message preceding it
+            (None for the first block)
+    """
+    messages = iter(messages)
+    previous_date = None
+    while True:
+        block = list(islice(messages, MESSAGES_PER_WRITE))
+        if not block:
+            return
+        yield block, previous_date
+        previous_date = block[-1]['date']
+
+def render_blocks(render_block, calls, workers=1):
+    """
+    Render blocks of messages, in worker processes if asked to.
+
+    render_block only computes strings and must be a module-level function,
+    so that it can run in another process. The rendered blocks are yielded
+    in order either way, so the output does not depend on the workers.
+
+    Args:
+        render_block (callable): Function rendering one block
+        calls (iterable): Argument tuples, one call of render_block per block
+        workers (int): Number of processes; 1 renders in the current process
+
+    Yields:
+        str: The rendered blocks
+    """
+    calls = iter(calls)
+    head = list(islice(calls, 2))
+    calls = chain(head, calls)
+
+    # A conversation that fits in one block is not worth starting processes for
+    if workers <= 1 or len(head) < 2:
+        for args in calls:
+            yield render_block(*args)
+        return
+
+    # Keep a few blocks in flight per worker and hand them back in order
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for args in calls:
+            pending.append(executor.submit(render_block, *args))
+            if len(pending) > 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -4,15 +4,63 @@ Excel exporter for Instagram conversation data.
 
 import os
 import logging
-from datetime import datetime
+import time
+from functools import lru_cache
 import pandas as pd
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 import instagram_data_processor.utils as utils
 
 logger = logging.getLogger(__name__)
 
+# Prefer xlsxwriter, which serializes large workbooks much faster than openpyxl.
+# openpyxl is kept as a fallback for installations without xlsxwriter, and is
+# only imported when it is actually used.
+try:
+    import xlsxwriter
+    EXCEL_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Workbook options for xlsxwriter: rows are flushed to disk as they are
+# written, and message text must never be turned into formulas or hyperlinks
+XLSXWRITER_OPTIONS = {
+    'constant_memory': True,
+    'strings_to_formulas': False,
+    'strings_to_urls': False,
+}
+
+# Header row style shared by all sheets
+HEADER_FORMAT = {
+    'bold': True,
+    'font_size': 12,
+    'bg_color': '#DDEBF7',
+    'border': 1,
+    'align': 'center',
+    'valign': 'vcenter',
+}
+
+@lru_cache(maxsize=None)
+def _openpyxl_header_style():
+    """
+    Build the openpyxl named style for header rows, once per process.
+
+    Returns:
+        NamedStyle: Header row style
+    """
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+
+    return NamedStyle(
+        name='header',
+        font=Font(bold=True, size=12),
+        fill=PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid"),
+        border=Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        ),
+        alignment=Alignment(horizontal='center', vertical='center')
+    )
+
 class ExcelExporter:
     """
     Export conversation data to an Excel file.
@@ -47,7 +95,7 @@ class ExcelExporter:
             return None
 
         # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         if is_group_chat:
             filename = f"group_chat_{target_user}_{timestamp}.xlsx"
         else:
@@ -55,20 +103,33 @@ class ExcelExporter:
         filepath = os.path.join(self.output_dir, filename)
 
         try:
-            # Create a Pandas Excel writer
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                # Create the conversation sheet
-                self._create_conversation_sheet(writer, messages, target_user, my_name)
+            # Create the conversation sheet
+            sheets = [self._create_conversation_sheet(messages, target_user, my_name)]
 
-                # Create the statistics sheet if stats are provided
-                if stats:
-                    self._create_statistics_sheet(writer, stats, target_user, my_name)
+            # Create the statistics sheet if stats are provided
+            if stats:
+                sheets.append(self._create_statistics_sheet(stats, target_user, my_name))
 
-                # Create the media sheet
-                self._create_media_sheet(writer, messages)
+            # Create the media sheet
+            sheets.append(self._create_media_sheet(messages))
 
-                # Apply styling to all sheets
-                self._apply_styling(writer)
+            if EXCEL_ENGINE == 'xlsxwriter':
+                # Write the sheets directly, row by row
+                self._write_with_xlsxwriter(filepath, sheets)
+            else:
+                # Create a Pandas Excel writer
+                with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+                    for sheet_name, data in sheets:
+                        if isinstance(data, pd.DataFrame):
+                            data.to_excel(writer, sheet_name=sheet_name, index=False)
+                        else:
+                            # Plain rows are appended to the worksheet as-is
+                            worksheet = writer.book.create_sheet(sheet_name)
+                            for row in data:
+                                worksheet.append(row)
+
+                    # Apply styling to all sheets
+                    self._apply_styling(writer, sheets)
 
             logger.info(f"Exported conversation to Excel file: {filepath}")
             return filepath
@@ -77,72 +138,101 @@ class ExcelExporter:
             logger.error(f"Error exporting to Excel file: {str(e)}")
             return None
 
-    def _create_conversation_sheet(self, writer, messages, target_user, my_name):
+    def _create_conversation_sheet(self, messages, target_user, my_name):
         """
-        Create the conversation sheet in the Excel file.
+        Prepare the conversation sheet for the Excel file.
 
         Args:
-            writer (ExcelWriter): Pandas Excel writer
             messages (list): List of processed messages
             target_user (str): Name of the target user
             my_name (str): Your name
+
+        Returns:
+            tuple: Sheet name and the DataFrame to write to it
         """
-        # Prepare data for the conversation sheet
-        conversation_data = []
+        # Prepare data for the conversation sheet, one list per column
+        dates, times, senders, contents = [], [], [], []
+        media, reactions = [], []
+        has_emoji, emoji_counts, is_good_morning = [], [], []
+        mentions_my_name, mentions_target_name, has_algerian_slang = [], [], []
 
-        for msg in messages:
-            # Media indicators
-            media_info = []
-            if msg['photos']:
-                media_info.append(f"{len(msg['photos'])} photo(s)")
-            if msg['videos']:
-                media_info.append(f"{len(msg['videos'])} video(s)")
-            if msg['audio']:
-                media_info.append(f"{len(msg['audio'])} audio(s)")
+        # Fixed sender names, keyed by the raw sender name
+        sender_cache = {}
 
-            media_str = ", ".join(media_info) if media_info else ""
+        for msg in messages:
+            # Media indicators, skipped entirely for the common no-media case
+            photos, videos, audio = msg['photos'], msg['videos'], msg['audio']
+            if photos or videos or audio:
+                media_info = []
+                if photos:
+                    media_info.append(f"{len(photos)} photo(s)")
+                if videos:
+                    media_info.append(f"{len(videos)} video(s)")
+                if audio:
+                    media_info.append(f"{len(audio)} audio(s)")
+                media_str = ", ".join(media_info)
+            else:
+                media_str = ""
 
             # Reactions
+            msg_reactions = msg['reactions']
             reactions_str = ", ".join(
-                f"{r['reaction']} by {r['actor']}" for r in msg['reactions']
-            ) if msg['reactions'] else ""
+                [f"{r['reaction']} by {r['actor']}" for r in msg_reactions]
+            ) if msg_reactions else ""
 
-            # Fix any broken text in sender name and content
-            sender = utils.fix_broken_text(msg['sender'])
-            content = msg['content'] if msg['content'] else ""
-            content = utils.fix_broken_text(content)
+            # Fix any broken text in sender name (once per unique sender) and content
+            sender = sender_cache.get(msg['sender'])
+            if sender is None:
+                sender = sender_cache[msg['sender']] = utils.fix_broken_text(msg['sender'])
+            content = utils.fix_broken_text(msg['content']) if msg['content'] else ""
 
             # Add row to data
-            conversation_data.append({
-                'Date': msg['date'],
-                'Time': msg['time'],
-                'Sender': sender,
-                'Message': content,
-                'Media': media_str,
-                'Reactions': reactions_str,
-                'Has Emoji': "Yes" if msg['has_emoji'] else "No",
-                'Emoji Count': msg['emoji_count'],
-                'Is Good Morning': "Yes" if msg['is_good_morning'] else "No",
-                'Mentions My Name': "Yes" if msg['mentions_my_name'] else "No",
-                'Mentions Target Name': "Yes" if msg['mentions_target_name'] else "No",
-                'Has Algerian Slang': "Yes" if msg['has_algerian_slang'] else "No"
-            })
-
-        # Create DataFrame
-        df = pd.DataFrame(conversation_data)
-
-        # Write to Excel
-        df.to_excel(writer, sheet_name='Conversation', index=False)
-
-    def _create_statistics_sheet(self, writer, stats, target_user, my_name):
+            dates.append(msg['date'])
+            times.append(msg['time'])
+            senders.append(sender)
+            contents.append(content)
+            media.append(media_str)
+            reactions.append(reactions_str)
+            has_emoji.append(bool(msg['has_emoji']))
+            emoji_counts.append(msg['emoji_count'])
+            is_good_morning.append(bool(msg['is_good_morning']))
+            mentions_my_name.append(bool(msg['mentions_my_name']))
+            mentions_target_name.append(bool(msg['mentions_target_name']))
+            has_algerian_slang.append(bool(msg['has_algerian_slang']))
+
+        # Create DataFrame directly from the column lists
+        df = pd.DataFrame({
+            'Date': dates,
+            'Time': times,
+            'Sender': senders,
+            'Message': contents,
+            'Media': media,
+            'Reactions': reactions,
+            'Has Emoji': has_emoji,
+            'Emoji Count': emoji_counts,
+            'Is Good Morning': is_good_morning,
+            'Mentions My Name': mentions_my_name,
+            'Mentions Target Name': mentions_target_name,
+            'Has Algerian Slang': has_algerian_slang
+        }, copy=False)
+
+        # Store the low-cardinality sender column once per distinct value; the
+        # flag columns are native booleans and written as TRUE/FALSE cells
+        df['Sender'] = df['Sender'].astype('category')
+
+        return 'Conversation', df
+
+    def _create_statistics_sheet(self, stats, target_user, my_name):
         """
-        Create the statistics sheet in the Excel file.
+        Prepare the statistics sheet for the Excel file.
 
         Args:
-            writer (ExcelWriter): Pandas Excel writer
             stats (dict): Statistics dictionary
             target_user (str): Name of the target user or group
             my_name (str): Your name
+
+        Returns:
+            tuple: Sheet name and the rows to write to it, title row first
         """
         # Check if this is a group chat
         is_group_chat = stats.get('is_group_chat', False)
@@ -193,110 +283,157 @@ class ExcelExporter:
             ['Top Emojis Used', ', '.join(stats['unique_emojis'][:20]) if stats['unique_emojis'] else 'None']
         ])
 
-        # Create DataFrame
-        df = pd.DataFrame(stats_data)
+        # The sheet is small and irregular, so its rows are written directly
+        # rather than through a DataFrame
+        return 'Statistics', stats_data
 
-        # Write to Excel
-        df.to_excel(writer, sheet_name='Statistics', header=False, index=False)
-
-    def _create_media_sheet(self, writer, messages):
+    def _create_media_sheet(self, messages):
         """
-        Create the media sheet in the Excel file.
+        Prepare the media sheet for the Excel file.
 
         Args:
-            writer (ExcelWriter): Pandas Excel writer
             messages (list): List of processed messages
+
+        Returns:
+            tuple: Sheet name and the DataFrame to write to it
         """
-        # Prepare data for the media sheet
-        media_data = []
+        # Prepare data for the media sheet, one list per column
+        dates, times, senders, types, uris = [], [], [], [], []
 
-        for msg in messages:
-            # Fix any broken text in sender name
-            sender = utils.fix_broken_text(msg['sender'])
-
-            # Add photos
-            for i, photo_uri in enumerate(msg['photos']):
-                media_data.append({
-                    'Date': msg['date'],
-                    'Time': msg['time'],
-                    'Sender': sender,
-                    'Type': 'Photo',
-                    'URI': photo_uri
-                })
-
-            # Add videos
-            for i, video_uri in enumerate(msg['videos']):
-                media_data.append({
-                    'Date': msg['date'],
-                    'Time': msg['time'],
-                    'Sender': sender,
-                    'Type': 'Video',
-                    'URI': video_uri
-                })
-
-            # Add audio
-            for i, audio_uri in enumerate(msg['audio']):
-                media_data.append({
-                    'Date': msg['date'],
-                    'Time': msg['time'],
-                    'Sender': sender,
-                    'Type': 'Audio',
-                    'URI': audio_uri
-                })
-
-        # Create DataFrame
-        df = pd.DataFrame(media_data)
-
-        # Write to Excel only if there's media data
-        if not df.empty:
-            df.to_excel(writer, sheet_name='Media Files', index=False)
-        else:
-            # Create an empty sheet with headers
-            pd.DataFrame(columns=['Date', 'Time', 'Sender', 'Type', 'URI']).to_excel(
-                writer, sheet_name='Media Files', index=False
-            )
+        # Fixed sender names, keyed by the raw sender name
+        sender_cache = {}
 
-    def _apply_styling(self, writer):
+        for msg in messages:
+            # Fix any broken text in sender name (once per unique sender)
+            sender = sender_cache.get(msg['sender'])
+            if sender is None:
+                sender = sender_cache[msg['sender']] = utils.fix_broken_text(msg['sender'])
+
+            # Add photos, videos and audio, one column block per media type
+            for media_type, media_uris in (('Photo', msg['photos']),
+                                           ('Video', msg['videos']),
+                                           ('Audio', msg['audio'])):
+                if media_uris:
+                    count = len(media_uris)
+                    dates.extend([msg['date']] * count)
+                    times.extend([msg['time']] * count)
+                    senders.extend([sender] * count)
+                    types.extend([media_type] * count)
+                    uris.extend(media_uris)
+
+        # Create DataFrame directly from the column lists; the sheet keeps its
+        # headers even when there's no media data
+        df = pd.DataFrame({
+            'Date': dates,
+            'Time': times,
+            'Sender': senders,
+            'Type': types,
+            'URI': uris
+        }, copy=False)
+
+        # Store low-cardinality columns once per distinct value
+        for column in ('Sender', 'Type'):
+            df[column] = df[column].astype('category')
+
+        return 'Media Files', df
+
+    def _apply_styling(self, writer, sheets):
         """
-        Apply styling to the Excel workbook.
+        Apply styling to an Excel workbook created with openpyxl.
 
         Args:
             writer (ExcelWriter): Pandas Excel writer
+            sheets (list): (sheet name, DataFrame or rows) pairs written to the workbook
         """
+        from openpyxl.utils import get_column_letter
+
         workbook = writer.book
+        header_style = _openpyxl_header_style()
 
-        # Define styles
-        header_font = Font(bold=True, size=12)
-        header_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        # Register the header style once, so header cells share one style entry
+        if header_style.name not in workbook.named_styles:
+            workbook.add_named_style(header_style)
 
         # Apply styles to each sheet
-        for sheet_name in workbook.sheetnames:
+        for sheet_name, data in sheets:
             worksheet = workbook[sheet_name]
 
             # Style the header row
             for cell in worksheet[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = border
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.style = header_style.name
 
             # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-
-                adjusted_width = (max_length + 2) * 1.2
-                worksheet.column_dimensions[column_letter].width = min(adjusted_width, 50)
+            for i, width in enumerate(self._column_widths(data), start=1):
+                worksheet.column_dimensions[get_column_letter(i)].width = width
+
+    def _write_with_xlsxwriter(self, filepath, sheets):
+        """
+        Write the sheets to an Excel file with xlsxwriter.
+
+        Rows are written straight from the DataFrame columns instead of going
+        through pandas' to_excel, which formats and writes every cell
+        individually and emits them column by column. Writing row by row lets
+        the workbook run in constant_memory mode.
+
+        Args:
+            filepath (str): Path of the Excel file to create
+            sheets (list): (sheet name, DataFrame or rows) pairs to write
+        """
+        workbook = xlsxwriter.Workbook(filepath, XLSXWRITER_OPTIONS)
+
+        try:
+            header_format = workbook.add_format(HEADER_FORMAT)
+
+            for sheet_name, data in sheets:
+                worksheet = workbook.add_worksheet(sheet_name)
+
+                # Auto-adjust column widths
+                for i, width in enumerate(self._column_widths(data)):
+                    worksheet.set_column(i, i, width)
+
+                if isinstance(data, pd.DataFrame):
+                    # Header from the column names, rows from native Python column values
+                    header = list(data.columns)
+                    columns = [data[column].tolist() for column in data.columns]
+                    rows = zip(*columns)
+                else:
+                    header, rows = data[0], data[1:]
+
+                # Write the styled header row, then the data rows
+                worksheet.write_row(0, 0, header, header_format)
+                for row, values in enumerate(rows, start=1):
+                    worksheet.write_row(row, 0, values)
+        finally:
+            workbook.close()
+
+    def _column_widths(self, data):
+        """
+        Compute column widths fitting the header and values of a sheet.
+
+        Widths are derived from the DataFrame with vectorized string lengths
+        instead of visiting every worksheet cell.
+
+        Args:
+            data (DataFrame or list): Data written to the sheet, or its rows
+
+        Returns:
+            list: Column widths, in sheet column order
+        """
+        if not isinstance(data, pd.DataFrame):
+            # Small sheets written as plain rows
+            return [
+                min((max(len(str(value)) for value in column) + 2) * 1.2, 50)
+                for column in zip(*data)
+            ]
+
+        widths = []
+
+        for column in data.columns:
+            max_length = len(str(column))
+            if not data.empty:
+                max_length = max(max_length, int(data[column].astype(str).str.len().max()))
+
+            adjusted_width = (max_length + 2) * 1.2
+            widths.append(min(adjusted_width, 50))
+
+        return widths
@@ -7,228 +7,143 @@ import os
 import logging
 import emoji
 from datetime import datetime
+import gzip
 import html
 import json
+import re
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 import instagram_data_processor.utils as utils
+from instagram_data_processor.exporters._blocks import WRITE_BUFFER_SIZE, iter_message_blocks, render_blocks
 
 logger = logging.getLogger(__name__)
 
-class HTMLExporter:
-    """
-    HTML exporter for Instagram conversations.
-    Creates animated, fancy HTML output with proper Arabic text rendering.
-    """
-
-    def __init__(self, output_dir):
-        """
-        Initialize the HTML exporter.
-
-        Args:
-            output_dir (str): Output directory for HTML files
-        """
-        self.output_dir = output_dir
-        logger.info(f"Initialized HTML exporter with output directory: {output_dir}")
-
-    def export(self, messages, target_user, my_name, stats=None, is_group_chat=False):
-        """
-        Export conversation to HTML file.
-
-        Args:
-            messages (list): List of processed messages
-            target_user (str): Name of the target user or group
-            my_name (str): Your name
-            stats (dict, optional): Statistics dictionary
-            is_group_chat (bool): Whether this is a group chat
-
-        Returns:
-            str: Path to the exported HTML file
-        """
-        try:
-            # Create filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            if is_group_chat:
-                filename = f"group_chat_{target_user}_{timestamp}.html"
-            else:
-                filename = f"conversation_with_{target_user}_{timestamp}.html"
-            filepath = os.path.join(self.output_dir, filename)
-
-            with open(filepath, 'w', encoding='utf-8') as file:
-                # Write HTML header
-                file.write(self._generate_html_header(target_user, my_name, is_group_chat))
-
-                # Write statistics if available
-                if stats:
-                    file.write(self._generate_stats_section(stats, target_user, my_name))
-
-                # Write conversation container opening
-                file.write('<div class="conversation-container">\n')
-
-                # Write messages
-                current_date = None
-
-                for msg in messages:
-                    # Check if we need to add a date separator
-                    date_str = msg['date']
-                    if date_str != current_date:
-                        current_date = date_str
-                        file.write(f'<div class="date-separator">{date_str}</div>\n')
-
-                    # Format message
-                    # Fix any broken text in sender name
-                    sender = utils.fix_broken_text(msg['sender'])
-                    time_str = msg['time']
-                    content = msg['content'] if msg['content'] else ""
-
-                    # Determine message class based on sender
-                    msg_class = "message-me" if sender == my_name else "message-other"
-
-                    # Start message container
-                    file.write(f'<div class="message-container {msg_class}-container">\n')
-
-                    # Message bubble with animation
-                    file.write(f'<div class="message-bubble {msg_class}" data-animation="fade-in">\n')
-
-                    # Sender and time
-                    file.write(f'<div class="message-header">\n')
-                    file.write(f'<span class="sender">{html.escape(sender)}</span>\n')
-                    file.write(f'<span class="time">{time_str}</span>\n')
-                    file.write('</div>\n')
-
-                    # Content - with special handling for Arabic text
-                    if content:
-                        # Fix any broken text encoding using the utils.fix_broken_text function
-                        content = utils.fix_broken_text(content)
-
-                        # Check if content contains Arabic characters
-                        has_arabic = any(ord(c) >= 0x0600 and ord(c) <= 0x06FF for c in content)
-                        content_class = "arabic-text" if has_arabic else ""
-
-                        # Add the message content
-                        file.write(f'<div class="message-content {content_class}">{html.escape(content)}</div>\n')
-
-                        # Add emoji count if there are emojis
-                        if msg['emoji_count'] > 0:
-                            emoji_list = ', '.join(msg['emojis'])
-                            file.write(f'<div class="emoji-count">Emojis: {msg["emoji_count"]} ({emoji_list})</div>\n')
-
-                    # Media indicators
-                    media_indicators = []
-                    if msg['photos']:
-                        media_indicators.append(f"📷 {len(msg['photos'])} photo(s)")
-                    if msg['videos']:
-                        media_indicators.append(f"🎬 {len(msg['videos'])} video(s)")
-                    if msg['audio']:
-                        media_indicators.append(f"🎵 {len(msg['audio'])} audio(s)")
-
-                    if media_indicators:
-                        media_str = " | ".join(media_indicators)
-                        file.write(f'<div class="media-info">{media_str}</div>\n')
-
-                    # Reactions
-                    if msg['reactions']:
-                        file.write('<div class="reactions">\n')
-                        for reaction in msg['reactions']:
-                            reaction_emoji = reaction['reaction']
-                            actor = reaction['actor']
-                            file.write(f'<span class="reaction" data-animation="bounce">{reaction_emoji} by {html.escape(actor)}</span>\n')
-                        file.write('</div>\n')
-
-                    # Close message bubble
-                    file.write('</div>\n')
-
-                    # Close message container
-                    file.write('</div>\n')
-
-                # Close conversation container
-                file.write('</div>\n')
-
-                # Write HTML footer with JavaScript for animations
-                file.write(self._generate_html_footer())
-
-            logger.info(f"Exported conversation to HTML file: {filepath}")
-            return filepath
-
-        except Exception as e:
-            logger.error(f"Error exporting to HTML file: {str(e)}")
-            return None
-
-    def _generate_html_header(self, target_user, my_name, is_group_chat=False):
-        """
-        Generate HTML header with CSS styles.
-
-        Args:
-            target_user (str): Name of the target user or group
-            my_name (str): Your name
-            is_group_chat (bool): Whether this is a group chat
+# Compression level of .html.gz exports; the fastest level already shrinks
+# the repetitive markup several times over
+GZIP_COMPRESSLEVEL = 1
+
+# Arabic, Arabic Supplement and Arabic Presentation Forms A/B
+ARABIC_RE = re.compile('[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+# Characters that html.escape replaces
+ESCAPE_RE = re.compile('[&<>"\']')
+
+# Message fields read for every message, fetched in a single call
+MESSAGE_FIELDS = itemgetter('sender', 'time', 'content', 'photos', 'videos', 'audio', 'reactions')
+
+# HTML templates for the conversation messages. Optional blocks of a message
+# (content, emojis, media, reactions) are rendered to empty strings when absent.
+DATE_SEPARATOR_TEMPLATE = '<div class="date-separator">%s</div>\n'
+MESSAGE_TEMPLATE = (
+    '<div class="message-container %s-container">\n'
+    '<div class="message-bubble %s" data-animation="fade-in">\n'
+    '<div class="message-header">\n'
+    '<span class="sender">%s</span>\n'
+    '<span class="time">%s</span>\n'
+    '</div>\n'
+    '%s%s%s%s'
+    '</div>\n'
+    '</div>\n'
+)
+CONTENT_TEMPLATE = '<div class="message-content %s">%s</div>\n'
+EMOJI_COUNT_TEMPLATE = '<div class="emoji-count">Emojis: %s (%s)</div>\n'
+MEDIA_INFO_TEMPLATE = '<div class="media-info">%s</div>\n'
+REACTIONS_TEMPLATE = '<div class="reactions">\n%s</div>\n'
+REACTION_TEMPLATE = '<span class="reaction" data-animation="bounce">%s by %s</span>\n'
+
+# Statistics section fragments
+STAT_CARD_TEMPLATE = '''
+                <div class="stat-card" data-animation="fade-in">
+                    <div class="stat-value">%s</div>
+                    <div class="stat-label">%s</div>
+                </div>
+'''
+CHARTS_SECTION = '''
+        <div class="charts-container">
+            <h2>Conversation Analytics</h2>
+            <div class="charts-grid">
+                <div class="chart-card">
+                    <div class="chart-title">Message Distribution</div>
+                    <canvas id="messageDistributionChart"></canvas>
+                </div>
+                <div class="chart-card">
+                    <div class="chart-title">Messages Over Time</div>
+                    <canvas id="messagesOverTimeChart"></canvas>
+                </div>
+                <div class="chart-card">
+                    <div class="chart-title">Emoji Usage</div>
+                    <canvas id="emojiUsageChart"></canvas>
+                </div>
+                <div class="chart-card">
+                    <div class="chart-title">Activity by Hour</div>
+                    <canvas id="activityByHourChart"></canvas>
+                </div>
+            </div>
+        </div>
+'''
+CHART_DATA_TEMPLATE = '''
+        <script>
+            // Chart data
+            const messageDistributionData = %s;
+            const messagesByDateData = %s;
+            const emojiData = %s;
+            const activityByHourData = %s;
+        </script>
+'''
 
-        Returns:
-            str: HTML header
-        """
-        return f'''<!DOCTYPE html>
-<html lang="en" dir="ltr">
-<head>
-    <meta charset="UTF-8">
-    <meta http-equiv="Content-Type" content="text/html; charset=utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="Instagram {'group chat' if is_group_chat else 'conversation'} with {html.escape(target_user)}">
-    <meta http-equiv="X-UA-Compatible" content="IE=edge">
-    <title>{'Group Chat: ' if is_group_chat else 'Conversation with '}{html.escape(target_user)}</title>
-    <!-- Google Fonts for better Arabic support -->
-    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Noto+Sans+Arabic:wght@400;700&display=swap">
-    <!-- Chart.js for statistics visualization -->
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>>
-    <style>
-        /* General styles */
-        @font-face {{
+# Static stylesheet of the exported page
+HTML_STYLE = '''        /* General styles */
+        @font-face {
             font-family: 'Noto Sans Arabic';
             src: url('https://fonts.googleapis.com/css2?family=Noto+Sans+Arabic:wght@400;700&display=swap');
             font-display: swap;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             line-height: 1.6;
             color: #333;
             background-color: #f5f5f5;
             margin: 0;
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 800px;
             margin: 0 auto;
             background-color: #fff;
             border-radius: 10px;
             box-shadow: 0 0 20px rgba(0, 0, 0, 0.1);
             overflow: hidden;
-        }}
+        }
 
         /* Header styles */
-        .header {{
+        .header {
             background: linear-gradient(135deg, #405de6, #5851db, #833ab4, #c13584, #e1306c, #fd1d1d);
             color: white;
             padding: 20px;
             text-align: center;
             position: relative;
             overflow: hidden;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             margin: 0;
             font-size: 24px;
             position: relative;
             z-index: 2;
-        }}
+        }
 
-        .header p {{
+        .header p {
             margin: 5px 0 0;
             opacity: 0.9;
             position: relative;
             z-index: 2;
-        }}
+        }
 
         /* Animated background for header */
-        .header::before {{
+        .header::before {
             content: '';
             position: absolute;
             top: 0;
@@ -239,50 +154,50 @@ class HTMLExporter:
             background-size: 30px 30px;
             z-index: 1;
             animation: move-background 15s linear infinite;
-        }}
+        }
 
-        @keyframes move-background {{
-            0% {{ background-position: 0 0; }}
-            100% {{ background-position: 60px 60px; }}
-        }}
+        @keyframes move-background {
+            0% { background-position: 0 0; }
+            100% { background-position: 60px 60px; }
+        }
 
         /* Stats section */
-        .stats-container {{
+        .stats-container {
             padding: 20px;
             background-color: #f9f9f9;
             border-bottom: 1px solid #eee;
-        }}
+        }
 
-        .stats-container h2 {{
+        .stats-container h2 {
             margin-top: 0;
             color: #333;
             font-size: 18px;
-        }}
+        }
 
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
             gap: 15px;
             margin-bottom: 30px;
-        }}
+        }
 
         /* Charts section */
-        .charts-container {{
+        .charts-container {
             padding: 20px;
             background-color: #fff;
             border-radius: 8px;
             box-shadow: 0 2px 5px rgba(0,0,0,0.05);
             margin-top: 20px;
-        }}
+        }
 
-        .charts-grid {{
+        .charts-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
             margin-top: 20px;
-        }}
+        }
 
-        .chart-card {{
+        .chart-card {
             background-color: white;
             border-radius: 8px;
             padding: 15px;
@@ -290,93 +205,93 @@ class HTMLExporter:
             transition: transform 0.3s ease, box-shadow 0.3s ease;
             height: 300px;
             position: relative;
-        }}
+        }
 
-        .chart-card:hover {{
+        .chart-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
+        }
 
-        .chart-title {{
+        .chart-title {
             text-align: center;
             margin-bottom: 15px;
             font-weight: bold;
             color: #333;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background-color: white;
             border-radius: 8px;
             padding: 15px;
             box-shadow: 0 2px 5px rgba(0,0,0,0.05);
             transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
+        }
 
-        .stat-card:hover {{
+        .stat-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
+        }
 
-        .stat-value {{
+        .stat-value {
             font-size: 24px;
             font-weight: bold;
             color: #e1306c;
             margin-bottom: 5px;
-        }}
+        }
 
-        .stat-label {{
+        .stat-label {
             color: #666;
             font-size: 14px;
-        }}
+        }
 
         /* Conversation styles */
-        .conversation-container {{
+        .conversation-container {
             padding: 20px;
             display: flex;
             flex-direction: column;
-        }}
+        }
 
-        .date-separator {{
+        .date-separator {
             text-align: center;
             margin: 20px 0;
             position: relative;
             color: #999;
             font-size: 14px;
-        }}
+        }
 
         .date-separator::before,
-        .date-separator::after {{
+        .date-separator::after {
             content: '';
             position: absolute;
             top: 50%;
             width: 40%;
             height: 1px;
             background-color: #eee;
-        }}
+        }
 
-        .date-separator::before {{
+        .date-separator::before {
             left: 0;
-        }}
+        }
 
-        .date-separator::after {{
+        .date-separator::after {
             right: 0;
-        }}
+        }
 
-        .message-container {{
+        .message-container {
             display: flex;
             margin-bottom: 15px;
             max-width: 80%;
-        }}
+        }
 
-        .message-me-container {{
+        .message-me-container {
             align-self: flex-end;
-        }}
+        }
 
-        .message-other-container {{
+        .message-other-container {
             align-self: flex-start;
-        }}
+        }
 
-        .message-bubble {{
+        .message-bubble {
             border-radius: 18px;
             padding: 10px 15px;
             box-shadow: 0 1px 2px rgba(0,0,0,0.1);
@@ -384,41 +299,41 @@ class HTMLExporter:
             overflow: hidden;
             animation-duration: 0.5s;
             animation-fill-mode: both;
-        }}
+        }
 
-        .message-me {{
+        .message-me {
             background: linear-gradient(135deg, #00c6ff, #0072ff);
             color: white;
             border-bottom-right-radius: 5px;
-        }}
+        }
 
-        .message-other {{
+        .message-other {
             background: linear-gradient(135deg, #f2f2f2, #e6e6e6);
             color: #333;
             border-bottom-left-radius: 5px;
-        }}
+        }
 
-        .message-header {{
+        .message-header {
             display: flex;
             justify-content: space-between;
             margin-bottom: 5px;
             font-size: 12px;
-        }}
+        }
 
-        .message-me .message-header {{
+        .message-me .message-header {
             color: rgba(255, 255, 255, 0.8);
-        }}
+        }
 
-        .message-other .message-header {{
+        .message-other .message-header {
             color: #999;
-        }}
+        }
 
-        .message-content {{
+        .message-content {
             word-wrap: break-word;
             margin-bottom: 5px;
-        }}
+        }
 
-        .emoji-count {{
+        .emoji-count {
             font-size: 12px;
             margin-top: 3px;
             padding: 2px 6px;
@@ -426,15 +341,15 @@ class HTMLExporter:
             border-radius: 10px;
             display: inline-block;
             color: #666;
-        }}
+        }
 
-        .message-me .emoji-count {{
+        .message-me .emoji-count {
             background-color: rgba(255, 255, 255, 0.3);
             color: rgba(255, 255, 255, 0.9);
-        }}
+        }
 
         /* Special handling for Arabic text */
-        .arabic-text {{
+        .arabic-text {
             direction: rtl;
             text-align: right;
             font-family: 'Noto Sans Arabic', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif, 'Arial Unicode MS', sans-serif;
@@ -443,238 +358,68 @@ class HTMLExporter:
             letter-spacing: 0.5px;
             font-weight: 400;
             font-size: 1.05em;
-        }}
+        }
 
-        .media-info {{
+        .media-info {
             font-size: 12px;
             margin-top: 5px;
             opacity: 0.8;
-        }}
+        }
 
-        .message-me .media-info {{
+        .message-me .media-info {
             color: rgba(255, 255, 255, 0.9);
-        }}
+        }
 
-        .reactions {{
+        .reactions {
             display: flex;
             flex-wrap: wrap;
             margin-top: 5px;
             gap: 5px;
-        }}
+        }
 
-        .reaction {{
+        .reaction {
             font-size: 12px;
             background-color: rgba(0, 0, 0, 0.1);
             padding: 2px 6px;
             border-radius: 10px;
             display: inline-block;
-        }}
+        }
 
-        .message-me .reaction {{
+        .message-me .reaction {
             background-color: rgba(255, 255, 255, 0.2);
-        }}
+        }
 
         /* Animations */
-        @keyframes fade-in {{
-            from {{ opacity: 0; transform: translateY(20px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
+        @keyframes fade-in {
+            from { opacity: 0; transform: translateY(20px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
 
-        @keyframes bounce {{
-            0%, 20%, 50%, 80%, 100% {{ transform: translateY(0); }}
-            40% {{ transform: translateY(-10px); }}
-            60% {{ transform: translateY(-5px); }}
-        }}
+        @keyframes bounce {
+            0%, 20%, 50%, 80%, 100% { transform: translateY(0); }
+            40% { transform: translateY(-10px); }
+            60% { transform: translateY(-5px); }
+        }
 
         /* Responsive design */
-        @media (max-width: 600px) {{
-            .container {{
+        @media (max-width: 600px) {
+            .container {
                 border-radius: 0;
                 box-shadow: none;
-            }}
+            }
 
-            .message-container {{
+            .message-container {
                 max-width: 90%;
-            }}
+            }
 
-            .stats-grid {{
+            .stats-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>{'Group Chat: ' if is_group_chat else 'Conversation with '}{html.escape(target_user)}</h1>
-            <p>Instagram Memory Book</p>
-        </div>
-'''
-
-    def _generate_stats_section(self, stats, target_user, my_name):
-        """
-        Generate HTML for the statistics section.
-
-        Args:
-            stats (dict): Statistics dictionary
-            target_user (str): Name of the target user or group
-            my_name (str): Your name
-
-        Returns:
-            str: HTML for statistics section
-        """
-        # Check if this is a group chat
-        is_group_chat = stats.get('is_group_chat', False)
-        html_content = '''
-        <div class="stats-container">
-            <h2>Conversation Statistics</h2>
-            <div class="stats-grid">
-'''
-
-        # Total messages
-        html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats['total_messages']}</div>
-                    <div class="stat-label">Total Messages</div>
-                </div>
-'''
-
-        # Group chat specific stats
-        if is_group_chat:
-            html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats.get('participants_count', 0)}</div>
-                    <div class="stat-label">Participants</div>
-                </div>
-'''
-
-            # Show top 5 most active participants
-            if 'most_active_participants' in stats:
-                for i, (participant, count) in enumerate(stats['most_active_participants'][:5]):
-                    html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{count}</div>
-                    <div class="stat-label">Messages from {html.escape(participant)}</div>
-                </div>
-'''
-        else:
-            # Messages by sender for individual chats
-            for sender, count in stats['messages_by_sender'].items():
-                html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{count}</div>
-                    <div class="stat-label">Messages from {html.escape(sender)}</div>
-                </div>
-'''
-
-        # Total emojis
-        html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats['total_emojis']}</div>
-                    <div class="stat-label">Total Emojis</div>
-                </div>
-'''
-
-        # Conversation duration
-        html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats['conversation_duration_days']}</div>
-                    <div class="stat-label">Conversation Days</div>
-                </div>
-'''
-
-        # First and last message dates
-        html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats['first_message_date']}</div>
-                    <div class="stat-label">First Message</div>
-                </div>
-
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats['last_message_date']}</div>
-                    <div class="stat-label">Last Message</div>
-                </div>
-'''
-
-        # Most active day
-        html_content += f'''
-                <div class="stat-card" data-animation="fade-in">
-                    <div class="stat-value">{stats['most_active_day']}</div>
-                    <div class="stat-label">Most Active Day ({stats['most_active_day_count']} messages)</div>
-                </div>
-'''
-
-        html_content += '''
-            </div>
-        </div>
-'''
-
-        # Add charts section
-        html_content += '''
-        <div class="charts-container">
-            <h2>Conversation Analytics</h2>
-            <div class="charts-grid">
-                <div class="chart-card">
-                    <div class="chart-title">Message Distribution</div>
-                    <canvas id="messageDistributionChart"></canvas>
-                </div>
-                <div class="chart-card">
-                    <div class="chart-title">Messages Over Time</div>
-                    <canvas id="messagesOverTimeChart"></canvas>
-                </div>
-                <div class="chart-card">
-                    <div class="chart-title">Emoji Usage</div>
-                    <canvas id="emojiUsageChart"></canvas>
-                </div>
-                <div class="chart-card">
-                    <div class="chart-title">Activity by Hour</div>
-                    <canvas id="activityByHourChart"></canvas>
-                </div>
-            </div>
-        </div>
-'''
-
-        # Add chart data as JSON for JavaScript to use
-        message_distribution = {}
-        for sender, count in stats['messages_by_sender'].items():
-            message_distribution[sender] = count
-
-        # Add messages by date data
-        messages_by_date = stats.get('messages_by_date', {})
-
-        # Add emoji data
-        emoji_data = {}
-        for emoji_char in stats.get('unique_emojis', [])[:10]:  # Top 10 emojis
-            emoji_data[emoji_char] = stats.get('emoji_counts', {}).get(emoji_char, 0)
-
-        # Add activity by hour data
-        activity_by_hour = stats.get('messages_by_hour', {})
-
-        # Convert data to JSON for JavaScript
-        html_content += f'''
-        <script>
-            // Chart data
-            const messageDistributionData = {json.dumps(message_distribution)};
-            const messagesByDateData = {json.dumps(messages_by_date)};
-            const emojiData = {json.dumps(emoji_data)};
-            const activityByHourData = {json.dumps(activity_by_hour)};
-        </script>
+            }
+        }
 '''
 
-        return html_content
-
-    def _generate_html_footer(self):
-        """
-        Generate HTML footer with JavaScript for animations and charts.
-
-        Returns:
-            str: HTML footer
-        """
-        return '''
-    </div>
-
-    <script>
-        // Animation functions
+# Static script animating the page and drawing the statistics charts
+HTML_SCRIPT = '''        // Animation functions
         document.addEventListener('DOMContentLoaded', function() {
             // Apply animations to elements with data-animation attribute
             const animatedElements = document.querySelectorAll('[data-animation]');
@@ -888,8 +633,9 @@ class HTMLExporter:
             const ctx = document.getElementById('emojiUsageChart').getContext('2d');
 
             // Prepare data
-            const emojis = Object.keys(emojiData);
-            const counts = emojis.map(emoji => emojiData[emoji]);
+            const entries = Object.entries(emojiData);
+            const emojis = entries.map(entry => entry[0]);
+            const counts = entries.map(entry => entry[1]);
 
             new Chart(ctx, {
                 type: 'bar',
@@ -928,15 +674,15 @@ class HTMLExporter:
         function createActivityByHourChart() {
             const ctx = document.getElementById('activityByHourChart').getContext('2d');
 
-            // Prepare data for 24 hours (0-23)
-            const hours = Array.from({length: 24}, (_, i) => i);
-            const counts = hours.map(hour => activityByHourData[hour] || 0);
+            // Message counts for the 24 hours (0-23), already filled in by the exporter
+            const counts = activityByHourData;
 
-            // Format hours for display (e.g., "01:00", "13:00")
-            const hourLabels = hours.map(hour => {
-                const formattedHour = hour.toString().padStart(2, '0');
-                return `${formattedHour}:00`;
-            });
+            // Hours formatted for display
+            const hourLabels = [
+                "00:00", "01:00", "02:00", "03:00", "04:00", "05:00", "06:00", "07:00",
+                "08:00", "09:00", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00",
+                "16:00", "17:00", "18:00", "19:00", "20:00", "21:00", "22:00", "23:00"
+            ];
 
             new Chart(ctx, {
                 type: 'bar',
@@ -980,7 +726,463 @@ class HTMLExporter:
                 }
             });
         }
-    </script>
-</body>
+'''
+
+# The stylesheet and script are either inlined in every page or written once
+# next to the pages and linked from them
+STYLE_FILENAME = 'style.css'
+SCRIPT_FILENAME = 'app.js'
+INLINE_STYLE_TEMPLATE = '    <style>\n%s    </style>\n'
+INLINE_SCRIPT_TEMPLATE = '    <script>\n%s    </script>\n'
+STYLE_LINK = f'    <link rel="stylesheet" href="{STYLE_FILENAME}">\n'
+SCRIPT_LINK = f'    <script src="{SCRIPT_FILENAME}"></script>\n'
+
+# Page skeleton, split around the stylesheet and script blocks so that those
+# can be written as pre-encoded bytes
+HTML_HEAD_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en" dir="ltr">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="Content-Type" content="text/html; charset=utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="Instagram %(chat_kind)s with %(target_user)s">
+    <meta http-equiv="X-UA-Compatible" content="IE=edge">
+    <title>%(chat_title)s%(target_user)s</title>
+    <!-- Google Fonts for better Arabic support -->
+    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Noto+Sans+Arabic:wght@400;700&display=swap">
+    <!-- Chart.js for statistics visualization -->
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>>
+'''
+HTML_BODY_TEMPLATE = '''</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>%(chat_title)s%(target_user)s</h1>
+            <p>Instagram Memory Book</p>
+        </div>
+'''
+HTML_FOOTER_TEMPLATE = '''
+    </div>
+
+%s</body>
 </html>
 '''
+
+def _fast_escape(text):
+    """
+    Escape text for HTML, returning it unchanged when there is nothing to
+    escape, which is the case for most messages.
+
+    Args:
+        text (str): Text to escape
+
+    Returns:
+        str: Escaped text
+    """
+    return html.escape(text) if ESCAPE_RE.search(text) else text
+
+# Participant names repeat throughout a conversation, so their escaped form is
+# computed once per name
+_escape_name = lru_cache(maxsize=1024)(_fast_escape)
+
+def _render_message_block(messages, my_name, current_date=None):
+    """
+    Render a block of conversation messages to HTML.
+
+    This only computes strings and never touches the output file, so blocks
+    can be rendered independently of writing them.
+
+    Args:
+        messages (list): Processed messages of the block
+        my_name (str): Your name
+        current_date (str, optional): Date of the message preceding the block,
+            so that its date separator is not repeated
+
+    Returns:
+        str: HTML for the messages of the block
+    """
+    parts = []
+    append = parts.append
+    html_escape = _fast_escape
+    fix_broken_text = utils.fix_broken_text
+    arabic_search = ARABIC_RE.search
+    message_fields = MESSAGE_FIELDS
+
+    # Escaped sender name and message class, keyed by the raw sender name
+    sender_cache = {}
+
+    # Messages are grouped by day, with a date separator before each day
+    for date_str, day_messages in groupby(messages, key=itemgetter('date')):
+        # The first day may continue from the previous block
+        if date_str != current_date:
+            current_date = date_str
+            append(DATE_SEPARATOR_TEMPLATE % date_str)
+
+        for msg in day_messages:
+            # Read the message fields once
+            sender_raw, time_str, content, photos, videos, audio, reactions = message_fields(msg)
+            content = content or ""
+
+            # Format message
+            # Fix any broken text in sender name and determine the
+            # message class (once per unique sender)
+            cached = sender_cache.get(sender_raw)
+            if cached is None:
+                sender = fix_broken_text(sender_raw)
+                msg_class = "message-me" if sender == my_name else "message-other"
+                cached = sender_cache[sender_raw] = (html_escape(sender), msg_class)
+            escaped_sender, msg_class = cached
+
+            # Content - with special handling for Arabic text
+            content_html = emoji_html = ""
+            if content:
+                # Fix any broken text encoding using the utils.fix_broken_text function
+                content = fix_broken_text(content)
+
+                # Check if content contains Arabic characters (never the case for ASCII text)
+                content_class = "arabic-text" if not content.isascii() and arabic_search(content) else ""
+                content_html = CONTENT_TEMPLATE % (content_class, html_escape(content))
+
+                # Add emoji count if there are emojis
+                emoji_count = msg['emoji_count']
+                if emoji_count > 0:
+                    emoji_html = EMOJI_COUNT_TEMPLATE % (emoji_count, ', '.join(msg['emojis']))
+
+            # Media indicators, skipped entirely for the common no-media case
+            media_html = ""
+            if photos or videos or audio:
+                media_indicators = []
+                if photos:
+                    media_indicators.append(f"📷 {len(photos)} photo(s)")
+                if videos:
+                    media_indicators.append(f"🎬 {len(videos)} video(s)")
+                if audio:
+                    media_indicators.append(f"🎵 {len(audio)} audio(s)")
+                media_html = MEDIA_INFO_TEMPLATE % " | ".join(media_indicators)
+
+            # Reactions
+            reactions_html = ""
+            if reactions:
+                reactions_html = REACTIONS_TEMPLATE % ''.join(
+                    REACTION_TEMPLATE % (reaction['reaction'], _escape_name(reaction['actor']))
+                    for reaction in reactions
+                )
+
+            # Message bubble with sender, time and the optional blocks
+            append(MESSAGE_TEMPLATE % (
+                msg_class, msg_class, escaped_sender, time_str,
+                content_html, emoji_html, media_html, reactions_html
+            ))
+
+    return ''.join(parts)
+
+@lru_cache(maxsize=32)
+def _html_header(target_user, is_group_chat, style_block):
+    """
+    Build the encoded page header. Repeated exports of the same conversation
+    reuse the cached result.
+
+    Args:
+        target_user (str): Name of the target user or group
+        is_group_chat (bool): Whether this is a group chat
+        style_block (bytes): Encoded inline stylesheet or stylesheet link
+
+    Returns:
+        bytes: UTF-8 encoded HTML header
+    """
+    fields = {
+        'chat_kind': 'group chat' if is_group_chat else 'conversation',
+        'chat_title': 'Group Chat: ' if is_group_chat else 'Conversation with ',
+        'target_user': html.escape(target_user),
+    }
+    return b''.join((
+        (HTML_HEAD_TEMPLATE % fields).encode('utf-8'),
+        style_block,
+        (HTML_BODY_TEMPLATE % fields).encode('utf-8'),
+    ))
+
+def _chart_json(data):
+    """
+    Serialize chart data for the inline chart script.
+
+    The JSON is compact and keeps emojis and Arabic names as UTF-8 instead
+    of \\uXXXX escapes. "</" is escaped so that a name can never close the
+    script element.
+
+    Args:
+        data (dict): Chart data
+
+    Returns:
+        str: JSON text
+    """
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+class HTMLExporter:
+    """
+    HTML exporter for Instagram conversations.
+    Creates animated, fancy HTML output with proper Arabic text rendering.
+    """
+
+    def __init__(self, output_dir, workers=1, external_assets=False, compress=False):
+        """
+        Initialize the HTML exporter.
+
+        Args:
+            output_dir (str): Output directory for HTML files
+            workers (int): Number of processes used to render the messages of
+                large conversations; 1 renders them in the current process
+            external_assets (bool): Write the stylesheet and script once to
+                the output directory and link them instead of inlining them
+                in every page
+            compress (bool): Write gzip-compressed .html.gz files
+        """
+        self.output_dir = output_dir
+        self.workers = workers
+        self.compress = compress
+
+        # The stylesheet block and the footer never change, so they are
+        # encoded once here instead of on every export
+        if external_assets and self._write_assets():
+            style_block = STYLE_LINK
+            script_block = SCRIPT_LINK
+        else:
+            style_block = INLINE_STYLE_TEMPLATE % HTML_STYLE
+            script_block = INLINE_SCRIPT_TEMPLATE % HTML_SCRIPT
+        self.style_block = style_block.encode('utf-8')
+        self.html_footer = (HTML_FOOTER_TEMPLATE % script_block).encode('utf-8')
+        logger.info(f"Initialized HTML exporter with output directory: {output_dir}")
+
+    def _write_assets(self):
+        """
+        Write the shared stylesheet and script to the output directory.
+
+        Files that are already up to date are left alone. Others are written
+        to a temporary file first and moved into place, so a page never links
+        a half-written asset.
+
+        Returns:
+            bool: True if both assets are available in the output directory
+        """
+        try:
+            for filename, content in ((STYLE_FILENAME, HTML_STYLE), (SCRIPT_FILENAME, HTML_SCRIPT)):
+                path = os.path.join(self.output_dir, filename)
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as file:
+                        if file.read() == content:
+                            continue
+
+                temp_path = path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    file.write(content)
+                os.replace(temp_path, path)
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error writing HTML assets, inlining them instead: {str(e)}")
+            return False
+
+    def export(self, messages, target_user, my_name, stats=None, is_group_chat=False):
+        """
+        Export conversation to HTML file.
+
+        Args:
+            messages (iterable): Processed messages, as a list or a generator;
+                a generator is consumed block by block and never held in memory
+            target_user (str): Name of the target user or group
+            my_name (str): Your name
+            stats (dict, optional): Statistics dictionary
+            is_group_chat (bool): Whether this is a group chat
+
+        Returns:
+            str: Path to the exported HTML file
+        """
+        temp_path = None
+        try:
+            # Create filename with timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if is_group_chat:
+                filename = f"group_chat_{target_user}_{timestamp}.html"
+            else:
+                filename = f"conversation_with_{target_user}_{timestamp}.html"
+            if self.compress:
+                filename += ".gz"
+            filepath = os.path.join(self.output_dir, filename)
+
+            # The page is written to a temporary file that replaces the final
+            # one once complete, so an interrupted export leaves no broken page
+            temp_path = filepath + ".part"
+
+            # The file is written in binary mode: the static parts of the page
+            # are already encoded and only the dynamic parts are encoded here
+            with open(temp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as raw_file:
+                # The gzip header records the name of the page once decompressed,
+                # not the name of the temporary file it is written to
+                if self.compress:
+                    file = gzip.GzipFile(filename=filename[:-len(".gz")], mode='wb',
+                                         fileobj=raw_file, compresslevel=GZIP_COMPRESSLEVEL)
+                else:
+                    file = raw_file
+
+                with file:
+                    # Write HTML header
+                    file.write(self._generate_html_header(target_user, my_name, is_group_chat))
+
+                    # Write statistics if available
+                    if stats:
+                        file.write(self._generate_stats_section(stats, target_user, my_name).encode('utf-8'))
+
+                    # Write conversation container opening
+                    file.write(b'<div class="conversation-container">\n')
+
+                    # Write messages block by block as they are rendered
+                    file.writelines(block.encode('utf-8') for block in self._render_messages(messages, my_name))
+
+                    # Close conversation container
+                    file.write(b'</div>\n')
+
+                    # Write HTML footer with JavaScript for animations
+                    file.write(self._generate_html_footer())
+
+            os.replace(temp_path, filepath)
+            logger.info(f"Exported conversation to HTML file: {filepath}")
+            return filepath
+
+        except Exception as e:
+            logger.error(f"Error exporting to HTML file: {str(e)}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def _render_messages(self, messages, my_name):
+        """
+        Render the conversation messages to HTML.
+
+        Messages are rendered in blocks of MESSAGES_PER_WRITE, each yielded as
+        one string, so the caller can write the conversation incrementally
+        without holding it all in memory.
+
+        Args:
+            messages (iterable): Processed messages, as a list or a generator
+            my_name (str): Your name
+
+        Returns:
+            iterator: HTML for each block of messages, as strings
+        """
+        return render_blocks(
+            _render_message_block,
+            ((block, my_name, previous_date) for block, previous_date in iter_message_blocks(messages)),
+            self.workers,
+        )
+
+    def _generate_html_header(self, target_user, my_name, is_group_chat=False):
+        """
+        Generate HTML header with CSS styles.
+
+        Args:
+            target_user (str): Name of the target user or group
+            my_name (str): Your name
+            is_group_chat (bool): Whether this is a group chat
+
+        Returns:
+            bytes: UTF-8 encoded HTML header
+        """
+        return _html_header(target_user, is_group_chat, self.style_block)
+
+    def _generate_stats_section(self, stats, target_user, my_name):
+        """
+        Generate HTML for the statistics section.
+
+        Args:
+            stats (dict): Statistics dictionary
+            target_user (str): Name of the target user or group
+            my_name (str): Your name
+
+        Returns:
+            str: HTML for statistics section
+        """
+        # Check if this is a group chat
+        is_group_chat = stats.get('is_group_chat', False)
+
+        # Collect the fragments of the section and join them once
+        parts = ['''
+        <div class="stats-container">
+            <h2>Conversation Statistics</h2>
+            <div class="stats-grid">
+''']
+        append = parts.append
+
+        # Total messages
+        append(STAT_CARD_TEMPLATE % (stats['total_messages'], 'Total Messages'))
+
+        # Group chat specific stats
+        if is_group_chat:
+            append(STAT_CARD_TEMPLATE % (stats.get('participants_count', 0), 'Participants'))
+
+            # Show top 5 most active participants
+            if 'most_active_participants' in stats:
+                parts.extend(
+                    STAT_CARD_TEMPLATE % (count, f'Messages from {_escape_name(participant)}')
+                    for participant, count in stats['most_active_participants'][:5]
+                )
+        else:
+            # Messages by sender for individual chats
+            parts.extend(
+                STAT_CARD_TEMPLATE % (count, f'Messages from {_escape_name(sender)}')
+                for sender, count in stats['messages_by_sender'].items()
+            )
+
+        # Total emojis
+        append(STAT_CARD_TEMPLATE % (stats['total_emojis'], 'Total Emojis'))
+
+        # Conversation duration
+        append(STAT_CARD_TEMPLATE % (stats['conversation_duration_days'], 'Conversation Days'))
+
+        # First and last message dates
+        append(STAT_CARD_TEMPLATE % (stats['first_message_date'], 'First Message'))
+        append(STAT_CARD_TEMPLATE % (stats['last_message_date'], 'Last Message'))
+
+        # Most active day
+        append(STAT_CARD_TEMPLATE % (stats['most_active_day'], f"Most Active Day ({stats['most_active_day_count']} messages)"))
+
+        append('''
+            </div>
+        </div>
+''')
+
+        # Add charts section
+        append(CHARTS_SECTION)
+
+        # Add chart data as JSON for JavaScript to use
+        message_distribution = stats['messages_by_sender']
+
+        # Add messages by date data
+        messages_by_date = stats.get('messages_by_date', {})
+
+        # Add emoji data for the top 10 emojis
+        emoji_counts = stats.get('emoji_counts', {})
+        emoji_data = {emoji_char: emoji_counts.get(emoji_char, 0) for emoji_char in stats.get('unique_emojis', [])[:10]}
+
+        # Add activity by hour data as one count per hour of the day
+        activity_by_hour = [0] * 24
+        for hour, count in stats.get('messages_by_hour', {}).items():
+            activity_by_hour[int(hour)] = count
+
+        # Convert data to JSON for JavaScript
+        append(CHART_DATA_TEMPLATE % (
+            _chart_json(message_distribution),
+            _chart_json(messages_by_date),
+            _chart_json(emoji_data),
+            _chart_json(activity_by_hour)
+        ))
+
+        return ''.join(parts)
+
+    def _generate_html_footer(self):
+        """
+        Generate HTML footer with JavaScript for animations and charts.
+
+        Returns:
+            bytes: UTF-8 encoded HTML footer
+        """
+        return self.html_footer
@@ -6,18 +6,27 @@ import os
 import logging
 from datetime import datetime
 from fpdf import FPDF
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-import numpy as np
-import tempfile
-import re
-from PIL import Image
-import io
-import emoji
+from fpdf.enums import XPos, YPos
+from fpdf.fonts import CoreFont
+import math
+from itertools import groupby
+from operator import itemgetter
 import instagram_data_processor.utils as utils
 
 logger = logging.getLogger(__name__)
 
+# Message fields read by the PDF message loop, fetched in one call per message
+MESSAGE_FIELDS = itemgetter('time', 'sender', 'content', 'photos', 'videos', 'audio', 'emoji_count', 'reactions')
+
+# Reaction labels indexed by whether I am the one who reacted
+REACTION_LABELS = ("Reacted [EMOJI]", "You reacted [EMOJI]")
+
+# Slice colors for the message distribution chart (matplotlib's default cycle)
+PIE_COLORS = [
+    (31, 119, 180), (255, 127, 14), (44, 160, 44), (214, 39, 40), (148, 103, 189),
+    (140, 86, 75), (227, 119, 194), (127, 127, 127), (188, 189, 34), (23, 190, 207),
+]
+
 class ConversationPDF(FPDF):
     """
     Custom PDF class for conversation export with enhanced styling.
@@ -38,9 +47,16 @@ class ConversationPDF(FPDF):
         self.bg_r, self.bg_g, self.bg_b = 245, 245, 245  # Light gray
         self.text_r, self.text_g, self.text_b = 52, 73, 94  # Dark blue-gray
 
+        # Lighter shades of the bubble colors for the gradient-like highlight
+        self.primary_light = tuple(min(255, c + 40) for c in (self.primary_r, self.primary_g, self.primary_b))
+        self.secondary_light = tuple(min(255, c + 40) for c in (self.secondary_r, self.secondary_g, self.secondary_b))
+
         # Page counter for alternating background colors
         self.page_count = 0
 
+        # Word widths used to measure message content, keyed by font
+        self._word_widths = {}
+
     def header(self):
         # Increment page counter
         self.page_count += 1
@@ -55,11 +71,11 @@ class ConversationPDF(FPDF):
         self.line(10, 20, 200, 20)
 
         # Set font for header
-        self.set_font('Arial', 'B', 14)
+        self.set_font('Helvetica', 'B', 14)
         self.set_text_color(self.primary_r, self.primary_g, self.primary_b)
 
         # Title
-        self.cell(0, 15, self.title, 0, 1, 'C')
+        self.cell(0, 15, self.title, align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
         # Reset text color
         self.set_text_color(self.text_r, self.text_g, self.text_b)
@@ -81,11 +97,11 @@ class ConversationPDF(FPDF):
         self.line(10, self.h - 20, 200, self.h - 20)
 
         # Set font for footer
-        self.set_font('Arial', 'I', 8)
+        self.set_font('Helvetica', 'I', 8)
         self.set_text_color(self.primary_r, self.primary_g, self.primary_b)
 
         # Page number
-        self.cell(0, 10, f'Page {self.page_no()} | Generated with Instagram Data Processor', 0, 0, 'C')
+        self.cell(0, 10, f'Page {self.page_no()} | Generated with Instagram Data Processor', align='C')
 
         # Reset text color
         self.set_text_color(self.text_r, self.text_g, self.text_b)
@@ -109,32 +125,34 @@ class ConversationPDF(FPDF):
         if is_me:
             align = 'R'
             bubble_r, bubble_g, bubble_b = self.primary_r, self.primary_g, self.primary_b
+            lighter = self.primary_light
             text_r, text_g, text_b = 255, 255, 255  # White
             x_offset = self.w - bubble_width - 15
         else:
             align = 'L'
             bubble_r, bubble_g, bubble_b = self.secondary_r, self.secondary_g, self.secondary_b
+            lighter = self.secondary_light
             text_r, text_g, text_b = 255, 255, 255  # White
             x_offset = 15
 
-        # Save current position
-        x, y = self.get_x(), self.get_y()
+        # Save current position (read and set x/y directly, fpdf2 keeps them as
+        # plain attributes and the bubble never uses negative offsets)
+        y = self.y
 
         # Check if we need to add a page
         if y > self.h - 40:
             self.add_page()
-            y = self.get_y()
+            y = self.y
 
         # Draw sender and timestamp
-        self.set_font('Arial', 'B', 8)
+        self.set_font('Helvetica', 'B', 8)
         self.set_text_color(bubble_r, bubble_g, bubble_b)
-        self.set_x(x_offset)
-        self.cell(bubble_width, 5, f"{sender} - {date_time}", 0, 1, align)
+        self.x = x_offset
+        self.cell(bubble_width, 5, f"{sender} - {date_time}", align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
         # Calculate content height
-        self.set_font('Arial', '', 10)
-        content_lines = self.get_multi_cell_lines(bubble_width, 5, content)
-        content_height = len(content_lines) * 5
+        self.set_font('Helvetica', '', 10)
+        content_height = self.get_multi_cell_lines(bubble_width, 5, content) * 5
 
         # Add extra height for reactions and media info
         extra_height = 0
@@ -145,36 +163,36 @@ class ConversationPDF(FPDF):
 
         # Draw message bubble with gradient-like effect
         # Draw main bubble
+        bubble_height = content_height + extra_height + 5
         self.set_fill_color(bubble_r, bubble_g, bubble_b)
-        self.rect(x_offset, y + 5, bubble_width, content_height + extra_height + 5, 'F', True, 3)
+        self.rect(x_offset, y + 5, bubble_width, bubble_height, 'F', True, 3)
 
-        # Add a lighter shade at the top for a gradient effect
-        lighter_r = min(255, bubble_r + 40)
-        lighter_g = min(255, bubble_g + 40)
-        lighter_b = min(255, bubble_b + 40)
-        self.set_fill_color(lighter_r, lighter_g, lighter_b)
-        self.rect(x_offset + 2, y + 7, bubble_width - 4, 8, 'F', True, 3)
+        # Add a lighter shade at the top for a gradient effect. It is kept
+        # inside the bubble's rounded corners, so a plain rectangle is enough
+        # and saves drawing four more corner arcs per message
+        self.set_fill_color(*lighter)
+        self.rect(x_offset + 2, y + 7, bubble_width - 4, min(8, bubble_height - 3), 'F')
 
         # Draw message content
         self.set_text_color(text_r, text_g, text_b)
-        self.set_xy(x_offset, y + 7)
+        self.x, self.y = x_offset, y + 7
         self.multi_cell(bubble_width, 5, content)
 
         # Draw media info if any
         if media_info:
-            self.set_font('Arial', 'I', 8)
-            self.set_xy(x_offset, y + 7 + content_height)
-            self.cell(bubble_width, 5, media_info, 0, 1, align)
+            self.set_font('Helvetica', 'I', 8)
+            self.x, self.y = x_offset, y + 7 + content_height
+            self.cell(bubble_width, 5, media_info, align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
         # Draw reactions if any
         if reactions:
             reaction_y = y + 7 + content_height + (5 if media_info else 0)
-            self.set_font('Arial', 'B', 8)
-            self.set_xy(x_offset, reaction_y)
-            self.cell(bubble_width, 5, reactions, 0, 1, align)
+            self.set_font('Helvetica', 'B', 8)
+            self.x, self.y = x_offset, reaction_y
+            self.cell(bubble_width, 5, reactions, align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
         # Move to position after the bubble
-        self.set_y(y + 10 + content_height + extra_height)
+        self.x, self.y = self.l_margin, y + 10 + content_height + extra_height
 
         # Add some space between messages
         self.ln(3)
@@ -183,48 +201,63 @@ class ConversationPDF(FPDF):
         """
         Calculate how many lines a multi_cell will use.
 
+        Words are measured with the current font, and their widths are cached
+        for the rest of the document.
+
         Args:
             w (float): Width of the cell
             h (float): Height of the cell
             txt (str): Text to calculate
 
         Returns:
-            list: List of lines
+            int: Number of lines
         """
-        # Store starting position
-        x = self.get_x()
-        y = self.get_y()
-
-        # Store current font settings
-        font_family = self.font_family
-        font_style = self.font_style
-        font_size = self.font_size_pt
-
-        # Create a temporary PDF to calculate lines
-        temp_pdf = FPDF()
-        temp_pdf.add_page()
-        temp_pdf.set_font(font_family, font_style, font_size)
-
-        # Split text into lines
-        lines = []
-        words = txt.split(' ')
-        line = ""
-
-        for word in words:
-            test_line = line + word + " "
-            test_width = temp_pdf.get_string_width(test_line)
-
-            if test_width > w:
-                lines.append(line)
-                line = word + " "
+        widths, char_widths = self._get_width_table()
+        font_size_pt, k = self.font_size_pt, self.k
+
+        # Count line breaks, accumulating the width of each word with its
+        # trailing space on the current line
+        lines = 1
+        line_width = 0.0
+
+        for word in txt.split(' '):
+            word_width = widths.get(word)
+            if word_width is None:
+                try:
+                    word_width = sum(char_widths[c] for c in word + " ") * font_size_pt * 0.001 / k
+                except (KeyError, TypeError):
+                    # No core font table, or a character outside it
+                    word_width = self.get_string_width(word + " ")
+                widths[word] = word_width
+
+            if line_width + word_width > w:
+                lines += 1
+                line_width = word_width
             else:
-                line = test_line
-
-        if line:
-            lines.append(line)
+                line_width += word_width
 
         return lines
 
+    def _get_width_table(self):
+        """
+        Get the measuring tables for the current font.
+
+        Core fonts carry a width per latin-1 character, so a new word can be
+        measured by summing those directly; other fonts or spacing settings
+        leave char_widths as None and fall back to get_string_width.
+
+        Returns:
+            tuple: (word width cache, character widths or None)
+        """
+        key = (self.font_family, self.font_style, self.font_size_pt)
+        table = self._word_widths.get(key)
+        if table is None:
+            char_widths = None
+            if isinstance(self.current_font, CoreFont) and self.font_stretching == 100 and not self.char_spacing:
+                char_widths = self.current_font.cw
+            table = self._word_widths[key] = ({}, char_widths)
+        return table
+
 
 class PDFExporter:
     """
@@ -278,16 +311,16 @@ class PDFExporter:
             pdf.add_page()
 
             # Title with large font
-            pdf.set_font('Arial', 'B', 24)
+            pdf.set_font('Helvetica', 'B', 24)
             pdf.set_text_color(pdf.primary_r, pdf.primary_g, pdf.primary_b)
-            pdf.cell(0, 20, "Instagram Memory Book", 0, 1, 'C')
+            pdf.cell(0, 20, "Instagram Memory Book", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
             # Subtitle
-            pdf.set_font('Arial', 'B', 18)
+            pdf.set_font('Helvetica', 'B', 18)
             if is_group_chat:
-                pdf.cell(0, 15, f"Group Chat: {target_user}", 0, 1, 'C')
+                pdf.cell(0, 15, f"Group Chat: {target_user}", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             else:
-                pdf.cell(0, 15, f"Conversation with {target_user}", 0, 1, 'C')
+                pdf.cell(0, 15, f"Conversation with {target_user}", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
             # Add a decorative line
             pdf.set_draw_color(pdf.primary_r, pdf.primary_g, pdf.primary_b)
@@ -296,20 +329,20 @@ class PDFExporter:
             pdf.ln(15)
 
             # Add generation info
-            pdf.set_font('Arial', 'I', 12)
+            pdf.set_font('Helvetica', 'I', 12)
             pdf.set_text_color(pdf.text_r, pdf.text_g, pdf.text_b)
-            pdf.cell(0, 10, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 0, 1, 'C')
+            pdf.cell(0, 10, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.ln(10)
 
             # Add a brief description
-            pdf.set_font('Arial', '', 12)
+            pdf.set_font('Helvetica', '', 12)
             pdf.multi_cell(0, 8, "This memory book contains your Instagram conversation history, including messages, media, and statistics. It's designed to help you preserve and revisit your meaningful conversations.", 0, 'C')
             pdf.ln(20)
 
             # Add conversation summary
             if stats:
-                pdf.set_font('Arial', 'B', 14)
-                pdf.cell(0, 10, "Conversation Summary", 0, 1, 'C')
+                pdf.set_font('Helvetica', 'B', 14)
+                pdf.cell(0, 10, "Conversation Summary", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
                 pdf.ln(5)
 
                 # Create a summary box
@@ -322,24 +355,24 @@ class PDFExporter:
                 pdf.rect(box_x, summary_y, box_width, 60, 'F')
 
                 # Add summary content
-                pdf.set_font('Arial', 'B', 12)
+                pdf.set_font('Helvetica', 'B', 12)
                 pdf.set_xy(box_x + 10, summary_y + 10)
-                pdf.cell(box_width - 20, 10, f"Total Messages: {stats['total_messages']}", 0, 1, 'L')
+                pdf.cell(box_width - 20, 10, f"Total Messages: {stats['total_messages']}", align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 pdf.set_xy(box_x + 10, summary_y + 25)
-                pdf.cell(box_width - 20, 10, f"Conversation Period: {stats['first_message_date']} to {stats['last_message_date']}", 0, 1, 'L')
+                pdf.cell(box_width - 20, 10, f"Conversation Period: {stats['first_message_date']} to {stats['last_message_date']}", align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 pdf.set_xy(box_x + 10, summary_y + 40)
-                pdf.cell(box_width - 20, 10, f"Duration: {stats['conversation_duration_days']} days", 0, 1, 'L')
+                pdf.cell(box_width - 20, 10, f"Duration: {stats['conversation_duration_days']} days", align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
             # Add statistics page
             if stats:
                 pdf.add_page()
 
                 # Statistics header
-                pdf.set_font('Arial', 'B', 18)
+                pdf.set_font('Helvetica', 'B', 18)
                 pdf.set_text_color(pdf.primary_r, pdf.primary_g, pdf.primary_b)
-                pdf.cell(0, 15, "Conversation Statistics", 0, 1, 'C')
+                pdf.cell(0, 15, "Conversation Statistics", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
                 pdf.ln(5)
 
                 # Reset text color
@@ -351,36 +384,31 @@ class PDFExporter:
                 right_col_x = pdf.w / 2 + 5
 
                 # Left column - Message counts
-                pdf.set_font('Arial', 'B', 12)
+                pdf.set_font('Helvetica', 'B', 12)
                 pdf.set_xy(left_col_x, pdf.get_y())
-                pdf.cell(col_width, 10, "Message Counts", 0, 1, 'L')
+                pdf.cell(col_width, 10, "Message Counts", align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
                 pdf.ln(2)
 
-                pdf.set_font('Arial', '', 10)
+                pdf.set_font('Helvetica', '', 10)
                 y_pos = pdf.get_y()
 
                 # Draw a light background for the stats
                 pdf.set_fill_color(245, 245, 245)  # Light gray
                 pdf.rect(left_col_x, y_pos, col_width, 70, 'F')
 
-                # Add message count stats
-                pdf.set_xy(left_col_x + 5, y_pos + 5)
-                pdf.cell(col_width - 10, 8, f"Total messages: {stats['total_messages']}", 0, 1)
+                # Add message count stats, one line each
+                count_lines = [f"Total messages: {stats['total_messages']}"]
+                count_lines.extend(f"From {sender}: {count}" for sender, count in stats['messages_by_sender'].items())
+                count_lines.append(f"'Good morning' messages: {stats['good_morning_count']}")
+                count_lines.append(f"Algerian slang: {stats['algerian_slang_count']}")
 
-                for sender, count in stats['messages_by_sender'].items():
-                    pdf.set_x(left_col_x + 5)
-                    pdf.cell(col_width - 10, 8, f"From {sender}: {count}", 0, 1)
-
-                pdf.set_x(left_col_x + 5)
-                pdf.cell(col_width - 10, 8, f"'Good morning' messages: {stats['good_morning_count']}", 0, 1)
-
-                pdf.set_x(left_col_x + 5)
-                pdf.cell(col_width - 10, 8, f"Algerian slang: {stats['algerian_slang_count']}", 0, 1)
+                pdf.set_xy(left_col_x + 5, y_pos + 5)
+                pdf.multi_cell(col_width - 10, 8, "\n".join(count_lines), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 # Right column - Emoji stats
-                pdf.set_font('Arial', 'B', 12)
+                pdf.set_font('Helvetica', 'B', 12)
                 pdf.set_xy(right_col_x, y_pos - 12)
-                pdf.cell(col_width, 10, "Emoji Statistics", 0, 1, 'L')
+                pdf.cell(col_width, 10, "Emoji Statistics", align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
                 pdf.ln(2)
 
                 # Draw a light background for the emoji stats
@@ -388,38 +416,33 @@ class PDFExporter:
                 pdf.rect(right_col_x, y_pos, col_width, 70, 'F')
 
                 # Add emoji stats
-                pdf.set_font('Arial', '', 10)
-                pdf.set_xy(right_col_x + 5, y_pos + 5)
-                pdf.cell(col_width - 10, 8, f"Total emojis used: {stats['total_emojis']}", 0, 1)
+                emoji_lines = [
+                    f"Total emojis used: {stats['total_emojis']}",
+                    f"Unique emojis: {stats['unique_emojis_count']}",
+                ]
 
-                pdf.set_x(right_col_x + 5)
-                pdf.cell(col_width - 10, 8, f"Unique emojis: {stats['unique_emojis_count']}", 0, 1)
-
-                # Top emojis
+                # Top emojis, up to 10
                 if stats['unique_emojis']:
-                    pdf.set_x(right_col_x + 5)
-                    pdf.cell(col_width - 10, 8, "Top emojis:", 0, 1)
-
-                    # Display up to 10 emojis
-                    emojis_to_show = stats['unique_emojis'][:10]
-                    emoji_text = " ".join(emojis_to_show)
+                    emoji_lines.append("Top emojis:")
+                    emoji_lines.append(" ".join(stats['unique_emojis'][:10]))
 
-                    pdf.set_x(right_col_x + 5)
-                    pdf.cell(col_width - 10, 8, emoji_text, 0, 1)
+                pdf.set_font('Helvetica', '', 10)
+                pdf.set_xy(right_col_x + 5, y_pos + 5)
+                pdf.multi_cell(col_width - 10, 8, "\n".join(emoji_lines), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 # Add charts if there are enough messages
                 if stats['total_messages'] > 10:
                     pdf.ln(80)  # Move down for the chart
-                    pdf.set_font('Arial', 'B', 12)
-                    pdf.cell(0, 10, "Message Distribution", 0, 1, 'C')
+                    pdf.set_font('Helvetica', 'B', 12)
+                    pdf.cell(0, 10, "Message Distribution", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                     # Create a pie chart for message distribution
                     self._add_message_distribution_chart(pdf, stats)
 
                 # Add timeline information
                 pdf.ln(10)
-                pdf.set_font('Arial', 'B', 12)
-                pdf.cell(0, 10, "Conversation Timeline", 0, 1, 'C')
+                pdf.set_font('Helvetica', 'B', 12)
+                pdf.cell(0, 10, "Conversation Timeline", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 # Create a timeline box
                 timeline_y = pdf.get_y()
@@ -431,105 +454,104 @@ class PDFExporter:
                 pdf.rect(timeline_x, timeline_y, timeline_width, 50, 'F')
 
                 # Add timeline content
-                pdf.set_font('Arial', '', 10)
+                pdf.set_font('Helvetica', '', 10)
                 pdf.set_xy(timeline_x + 10, timeline_y + 5)
-                pdf.cell(timeline_width - 20, 8, f"First message: {stats['first_message_date']}", 0, 1)
+                pdf.cell(timeline_width - 20, 8, f"First message: {stats['first_message_date']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 pdf.set_xy(timeline_x + 10, timeline_y + 15)
-                pdf.cell(timeline_width - 20, 8, f"Last message: {stats['last_message_date']}", 0, 1)
+                pdf.cell(timeline_width - 20, 8, f"Last message: {stats['last_message_date']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 pdf.set_xy(timeline_x + 10, timeline_y + 25)
-                pdf.cell(timeline_width - 20, 8, f"Conversation duration: {stats['conversation_duration_days']} days", 0, 1)
+                pdf.cell(timeline_width - 20, 8, f"Conversation duration: {stats['conversation_duration_days']} days", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
                 pdf.set_xy(timeline_x + 10, timeline_y + 35)
-                pdf.cell(timeline_width - 20, 8, f"Most active day: {stats['most_active_day']} ({stats['most_active_day_count']} messages)", 0, 1)
+                pdf.cell(timeline_width - 20, 8, f"Most active day: {stats['most_active_day']} ({stats['most_active_day_count']} messages)", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
             # Conversation section
             pdf.add_page()
-            pdf.set_font('Arial', 'B', 16)
+            pdf.set_font('Helvetica', 'B', 16)
             pdf.set_text_color(pdf.primary_r, pdf.primary_g, pdf.primary_b)
-            pdf.cell(0, 10, "Conversation Messages", 0, 1, 'C')
+            pdf.cell(0, 10, "Conversation Messages", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.ln(5)
 
             # Reset text color
             pdf.set_text_color(pdf.text_r, pdf.text_g, pdf.text_b)
 
             # Set font for messages
-            pdf.set_font('Arial', '', 10)
-
-            # Add a date separator for the first message
-            current_date = None
-
-            # Write messages
-            for msg in messages:
-                # Format date and time
-                date_str = msg['date']
-                time_str = msg['time']
-                date_time = f"{time_str}"
-                # Fix any broken text in sender name
-                sender = utils.fix_broken_text(msg['sender'])
-
-                # Check if we need to add a date separator
-                if date_str != current_date:
-                    current_date = date_str
-
-                    # Add some space before the date separator
-                    pdf.ln(5)
-
-                    # Add date separator
-                    pdf.set_font('Arial', 'B', 10)
-                    pdf.set_text_color(pdf.text_r, pdf.text_g, pdf.text_b)
-                    pdf.set_fill_color(230, 230, 230)  # Light gray
-                    pdf.cell(0, 8, f"--- {date_str} ---", 0, 1, 'C', True)
-                    pdf.ln(5)
-
-                # Prepare content - sanitize for PDF
-                content = msg['content'] if msg['content'] else ""
-                # First fix any broken text encoding, then sanitize for PDF
-                content = utils.fix_broken_text(content)
-                content = utils.sanitize_for_pdf(content)
-
-                # Prepare media info
-                media_indicators = []
-                if msg['photos']:
-                    media_indicators.append(f"[PHOTO: {len(msg['photos'])}]")
-                if msg['videos']:
-                    media_indicators.append(f"[VIDEO: {len(msg['videos'])}]")
-                if msg['audio']:
-                    media_indicators.append(f"[AUDIO: {len(msg['audio'])}]")
-
-                # Add emoji count if there are emojis
-                if msg['emoji_count'] > 0:
-                    media_indicators.append(f"[EMOJIS: {msg['emoji_count']}]")
-
-                media_info = " ".join(media_indicators) if media_indicators else None
-
-                # Prepare reactions
-                reaction_str = None
-                if msg['reactions']:
-                    # Format reactions in a more readable way
-                    reaction_parts = []
-                    for r in msg['reactions']:
-                        reaction_emoji = r['reaction']
-                        actor = r['actor']
-                        # Format: "Reacted [EMOJI] to your message" or "You reacted [EMOJI]"
-                        # Replace emoji with [EMOJI] to avoid font issues
-                        if actor == my_name:
-                            reaction_parts.append(f"You reacted [EMOJI]")
-                        else:
-                            reaction_parts.append(f"Reacted [EMOJI]")
+            pdf.set_font('Helvetica', '', 10)
+
+            # Bind the per-message helpers once instead of looking them up every iteration
+            fix_text = utils.fix_broken_text
+            sanitize = utils.sanitize_for_pdf
+            add_bubble = pdf.add_message_bubble
+            message_fields = MESSAGE_FIELDS
 
-                    reaction_str = " | ".join(reaction_parts)
+            # Write messages, one date separator per run of messages on the same day
+            for date_str, day_messages in groupby(messages, key=itemgetter('date')):
+                # Add some space before the date separator
+                pdf.ln(5)
+
+                # Add date separator
+                pdf.set_font('Helvetica', 'B', 10)
+                pdf.set_text_color(pdf.text_r, pdf.text_g, pdf.text_b)
+                pdf.set_fill_color(230, 230, 230)  # Light gray
+                pdf.cell(0, 8, f"--- {date_str} ---", align='C', fill=True, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                pdf.ln(5)
 
-                # Add message bubble
-                pdf.add_message_bubble(
-                    sender=sender,
-                    date_time=date_time,
-                    content=content,
-                    reactions=reaction_str,
-                    media_info=media_info,
-                    is_me=(sender == my_name)
-                )
+                for msg in day_messages:
+                    time_str, sender, content, photos, videos, audio, emoji_count, reactions = message_fields(msg)
+
+                    # Format time
+                    date_time = f"{time_str}"
+                    # Fix any broken text in sender name (ASCII text is never broken)
+                    sender = sender or ""
+                    if not sender.isascii():
+                        sender = fix_text(sender)
+
+                    # Prepare content - sanitize for PDF
+                    content = content if content else ""
+                    # First fix any broken text encoding, then sanitize for PDF.
+                    # Both leave ASCII text unchanged, which most messages are
+                    if not content.isascii():
+                        content = fix_text(content)
+                        content = sanitize(content)
+
+                    # Prepare media info
+                    media_info = None
+                    if photos or videos or audio or emoji_count > 0:
+                        media_indicators = []
+                        if photos:
+                            media_indicators.append(f"[PHOTO: {len(photos)}]")
+                        if videos:
+                            media_indicators.append(f"[VIDEO: {len(videos)}]")
+                        if audio:
+                            media_indicators.append(f"[AUDIO: {len(audio)}]")
+
+                        # Add emoji count if there are emojis
+                        if emoji_count > 0:
+                            media_indicators.append(f"[EMOJIS: {emoji_count}]")
+
+                        media_info = " ".join(media_indicators)
+
+                    # Prepare reactions
+                    reaction_str = None
+                    if reactions:
+                        # Format: "Reacted [EMOJI]" or "You reacted [EMOJI]", with the
+                        # emoji replaced by [EMOJI] to avoid font issues
+                        if len(reactions) == 1:
+                            reaction_str = REACTION_LABELS[reactions[0]['actor'] == my_name]
+                        else:
+                            reaction_str = " | ".join([REACTION_LABELS[r['actor'] == my_name] for r in reactions])
+
+                    # Add message bubble
+                    add_bubble(
+                        sender=sender,
+                        date_time=date_time,
+                        content=content,
+                        reactions=reaction_str,
+                        media_info=media_info,
+                        is_me=(sender == my_name)
+                    )
 
             # Save the PDF
             pdf.output(filepath)
@@ -550,32 +572,58 @@ class PDFExporter:
             stats (dict): Statistics dictionary
         """
         try:
-            # Create a temporary file for the chart
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                temp_filename = tmp.name
-
-            # Create the pie chart
-            fig, ax = plt.subplots(figsize=(6, 4))
-
-            # Data for the pie chart
             labels = list(stats['messages_by_sender'].keys())
             sizes = list(stats['messages_by_sender'].values())
+            total = sum(sizes)
+            if total <= 0:
+                return
+
+            # Draw the pie straight onto the page as vector sectors; rendering
+            # it through matplotlib meant a PNG round trip for two slices.
+            diameter = 70
+            height = max(diameter, 10 + len(labels) * 8)
+            if pdf.get_y() + height + 10 > pdf.page_break_trigger:
+                pdf.add_page()
+            top = pdf.get_y() + 5
+            left = pdf.w / 2 - diameter - 10
+            center_x = left + diameter / 2
+            center_y = top + diameter / 2
+            legend_x = pdf.w / 2 + 10
+
+            # Start at 12 o'clock and go counterclockwise like ax.pie(startangle=90).
+            # Angles here grow counterclockwise with y pointing up, while fpdf2
+            # measures them on the page, where y points down, hence the negation
+            angle = 90
+            for index, (label, size) in enumerate(zip(labels, sizes)):
+                if size <= 0:
+                    continue
+                color = PIE_COLORS[index % len(PIE_COLORS)]
+                sweep = 360 * size / total
+                pdf.set_fill_color(*color)
+                if sweep >= 360:
+                    pdf.ellipse(left, top, diameter, diameter, style='F')
+                else:
+                    pdf.solid_arc(left, top, diameter, -(angle + sweep), -angle, style='F')
+
+                # Percentage at the middle of the slice
+                middle = math.radians(angle + sweep / 2)
+                percent = f"{100 * size / total:.1f}%"
+                pdf.set_font('Helvetica', 'B', 9)
+                pdf.set_text_color(255, 255, 255)
+                pdf.text(center_x + diameter * 0.3 * math.cos(middle) - pdf.get_string_width(percent) / 2,
+                         center_y - diameter * 0.3 * math.sin(middle) + 1.5, percent)
+
+                # Legend entry
+                legend_y = top + 10 + index * 8
+                pdf.rect(legend_x, legend_y, 5, 5, 'F')
+                pdf.set_font('Helvetica', '', 10)
+                pdf.set_text_color(pdf.text_r, pdf.text_g, pdf.text_b)
+                pdf.text(legend_x + 8, legend_y + 4, f"{label}: {size} ({percent})")
 
-            # Create pie chart
-            ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-
-            plt.title('Message Distribution')
-
-            # Save the chart to the temporary file
-            plt.savefig(temp_filename, bbox_inches='tight')
-            plt.close()
-
-            # Add the chart to the PDF
-            pdf.image(temp_filename, x=10, w=180)
+                angle += sweep
 
-            # Clean up the temporary file
-            os.unlink(temp_filename)
+            pdf.set_text_color(pdf.text_r, pdf.text_g, pdf.text_b)
+            pdf.set_y(top + height + 5)
 
         except Exception as e:
             logger.error(f"Error creating message distribution chart: {str(e)}")
@@ -5,24 +5,135 @@ Text file exporter for Instagram conversation data.
 import os
 import logging
 from datetime import datetime
+from operator import itemgetter
 import instagram_data_processor.utils as utils
+from instagram_data_processor.exporters._blocks import WRITE_BUFFER_SIZE, iter_message_blocks, render_blocks
 
 logger = logging.getLogger(__name__)
 
+# Message fields written to the text file, fetched in one call per message
+MESSAGE_FIELDS = itemgetter('date', 'time', 'sender', 'content', 'photos', 'videos', 'audio',
+                            'emoji_count', 'emojis', 'reactions')
+REACTION_FIELDS = itemgetter('reaction', 'actor')
+
+# Reactions line of a message, filled with its "<reaction> by <actor>" entries
+# and followed by the blank line that ends the message
+REACTIONS_TEMPLATE = "    Reactions: %s\n\n"
+REACTION_TEMPLATE = "%s by %s"
+
+# Separator lines between the sections of the file
+SEP_EQ = "=" * 80 + "\n"
+SEP_DASH = "-" * 80 + "\n"
+
+# File header, filled with the target user and the export time
+HEADER_TEMPLATE = "Conversation with %s\nGenerated on: %s\n" + SEP_EQ + "\n"
+
+# Statistics section, filled from the stats dict and written in one call
+STATS_TEMPLATE = (
+    "CONVERSATION STATISTICS\n"
+    + SEP_DASH +
+    "Total messages: %(total_messages)s\n"
+    "%(messages_by_sender)s"
+    "Total emojis used: %(total_emojis)s\n"
+    "Unique emojis used: %(unique_emojis_count)s\n"
+    "'Good morning' messages: %(good_morning_count)s\n"
+    "Mentions of '%(my_name)s': %(my_name_mentions)s\n"
+    "Mentions of '%(target_user)s': %(target_name_mentions)s\n"
+    "Active conversation days: %(active_conversation_days)s\n"
+    "First message date: %(first_message_date)s\n"
+    "Last message date: %(last_message_date)s\n"
+    "Conversation duration: %(conversation_duration_days)s days\n"
+    "Algerian slang expressions: %(algerian_slang_count)s\n"
+    "Most active day: %(most_active_day)s (%(most_active_day_count)s messages)\n"
+    "\n" + SEP_EQ + "\n"
+)
+
+# Heading of the conversation section
+CONVERSATION_HEADING = ("CONVERSATION\n" + SEP_DASH + "\n").encode('utf-8')
+
+def _render_message_block(messages):
+    """
+    Render a block of conversation messages to text.
+
+    This only computes strings and never touches the output file, so blocks
+    can be rendered independently of writing them.
+
+    Args:
+        messages (list): Processed messages of the block
+
+    Returns:
+        str: Text for the messages of the block
+    """
+    chunks = []
+    append = chunks.append
+    message_fields = MESSAGE_FIELDS
+    reaction_fields = REACTION_FIELDS
+    fix_text = utils.fix_broken_text
+
+    # Fixed sender name, keyed by the raw sender name
+    sender_cache = {}
+
+    for msg in messages:
+        date, time_str, sender_raw, content, photos, videos, audio, emoji_count, emojis, reactions = message_fields(msg)
+
+        # Fix any broken text in sender name (once per unique sender)
+        sender = sender_cache.get(sender_raw)
+        if sender is None:
+            sender = sender_cache[sender_raw] = fix_text(sender_raw)
+        # Fix any broken text in content (ASCII text is never broken)
+        content = content if content else ""
+        if not content.isascii():
+            content = fix_text(content)
+
+        # Format: [Date Time] Sender: Content [media indicators]
+        # A blank line follows each message for readability, after its
+        # reactions if it has any
+        line_end = "\n" if reactions else "\n\n"
+
+        # Add media indicators (most messages are plain text and have none)
+        if photos or videos or audio or emoji_count > 0:
+            media_indicators = []
+            if photos:
+                media_indicators.append(f"[{len(photos)} photo(s)]")
+            if videos:
+                media_indicators.append(f"[{len(videos)} video(s)]")
+            if audio:
+                media_indicators.append(f"[{len(audio)} audio(s)]")
+
+            # Add emoji count if there are emojis
+            if emoji_count > 0:
+                emoji_list = ", ".join(emojis)
+                media_indicators.append(f"[{emoji_count} emoji(s): {emoji_list}]")
+
+            append(f"[{date} {time_str}] {sender}: {content} {' '.join(media_indicators)}{line_end}")
+        else:
+            append(f"[{date} {time_str}] {sender}: {content}{line_end}")
+
+        # Add reactions if any
+        if reactions:
+            append(REACTIONS_TEMPLATE % ", ".join([
+                REACTION_TEMPLATE % reaction for reaction in map(reaction_fields, reactions)
+            ]))
+
+    return "".join(chunks)
+
 class TxtExporter:
     """
     Export conversation data to a text file.
     """
 
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, workers=1):
         """
         Initialize the TXT exporter.
 
         Args:
             output_dir (str): Directory to save the output file
+            workers (int): Number of processes used to format the messages of
+                large conversations; 1 formats them in the current process
         """
         self.output_dir = output_dir
-        logger.info(f"Initialized TXT exporter with output directory: {output_dir}")
+        self.workers = workers
+        logger.info("Initialized TXT exporter with output directory: %s", output_dir)
 
     def export(self, messages, target_user, my_name, stats=None):
         """
@@ -42,88 +153,60 @@ class TxtExporter:
             return None
 
         # Create filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"conversation_with_{target_user}_{timestamp}.txt"
         filepath = os.path.join(self.output_dir, filename)
 
         try:
-            with open(filepath, 'w', encoding='utf-8') as file:
+            # The file is written in binary, with each block of text encoded to UTF-8 once
+            with open(filepath, 'wb', buffering=WRITE_BUFFER_SIZE) as file:
                 # Write header
-                file.write(f"Conversation with {target_user}\n")
-                file.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                file.write("=" * 80 + "\n\n")
+                file.write((HEADER_TEMPLATE % (target_user, now.strftime('%Y-%m-%d %H:%M:%S'))).encode('utf-8'))
 
                 # Write statistics if provided
                 if stats:
-                    file.write("CONVERSATION STATISTICS\n")
-                    file.write("-" * 80 + "\n")
-                    file.write(f"Total messages: {stats['total_messages']}\n")
-
-                    for sender, count in stats['messages_by_sender'].items():
-                        file.write(f"Messages from {sender}: {count}\n")
-
-                    file.write(f"Total emojis used: {stats['total_emojis']}\n")
-                    file.write(f"Unique emojis used: {stats['unique_emojis_count']}\n")
-                    file.write(f"'Good morning' messages: {stats['good_morning_count']}\n")
-                    file.write(f"Mentions of '{my_name}': {stats['my_name_mentions']}\n")
-                    file.write(f"Mentions of '{target_user}': {stats['target_name_mentions']}\n")
-                    file.write(f"Active conversation days: {stats['active_conversation_days']}\n")
-                    file.write(f"First message date: {stats['first_message_date']}\n")
-                    file.write(f"Last message date: {stats['last_message_date']}\n")
-                    file.write(f"Conversation duration: {stats['conversation_duration_days']} days\n")
-                    file.write(f"Algerian slang expressions: {stats['algerian_slang_count']}\n")
-                    file.write(f"Most active day: {stats['most_active_day']} ({stats['most_active_day_count']} messages)\n")
-                    file.write("\n" + "=" * 80 + "\n\n")
+                    messages_by_sender = "".join(
+                        f"Messages from {sender}: {count}\n"
+                        for sender, count in stats['messages_by_sender'].items()
+                    )
+                    file.write((STATS_TEMPLATE % {
+                        **stats,
+                        'messages_by_sender': messages_by_sender,
+                        'my_name': my_name,
+                        'target_user': target_user,
+                    }).encode('utf-8'))
 
                 # Write messages
-                file.write("CONVERSATION\n")
-                file.write("-" * 80 + "\n\n")
-
-                for msg in messages:
-                    # Format: [Date] [Time] [Sender]: [Content]
-                    date_time = f"[{msg['date']} {msg['time']}]"
-                    # Fix any broken text in sender name
-                    sender = utils.fix_broken_text(msg['sender'])
-                    # Fix any broken text in content
-                    content = msg['content'] if msg['content'] else ""
-                    content = utils.fix_broken_text(content)
-
-                    # Add media indicators
-                    media_indicators = []
-                    if msg['photos']:
-                        media_indicators.append(f"[{len(msg['photos'])} photo(s)]")
-                    if msg['videos']:
-                        media_indicators.append(f"[{len(msg['videos'])} video(s)]")
-                    if msg['audio']:
-                        media_indicators.append(f"[{len(msg['audio'])} audio(s)]")
-
-                    # Add emoji count if there are emojis
-                    if msg['emoji_count'] > 0:
-                        emoji_list = ", ".join(msg['emojis'])
-                        media_indicators.append(f"[{msg['emoji_count']} emoji(s): {emoji_list}]")
-
-                    media_str = " ".join(media_indicators)
-
-                    # Format the line
-                    line = f"{date_time} {sender}: {content}"
-                    if media_str:
-                        line += f" {media_str}"
-
-                    file.write(line + "\n")
-
-                    # Add reactions if any
-                    if msg['reactions']:
-                        reaction_str = "Reactions: " + ", ".join(
-                            f"{r['reaction']} by {r['actor']}" for r in msg['reactions']
-                        )
-                        file.write(f"    {reaction_str}\n")
-
-                    # Add a blank line for readability
-                    file.write("\n")
-
-            logger.info(f"Exported conversation to TXT file: {filepath}")
+                file.write(CONVERSATION_HEADING)
+
+                # Write the messages one block at a time
+                for block in self._render_messages(messages):
+                    file.write(block.encode('utf-8'))
+
+            logger.info("Exported conversation to TXT file: %s", filepath)
             return filepath
 
         except Exception as e:
-            logger.error(f"Error exporting to TXT file: {str(e)}")
+            logger.error("Error exporting to TXT file: %s", e)
             return None
+
+    def _render_messages(self, messages):
+        """
+        Render the conversation messages to text.
+
+        Messages are rendered in blocks of MESSAGES_PER_WRITE, each yielded as
+        one string, so the caller can write the conversation incrementally
+        without holding it all in memory.
+
+        Args:
+            messages (iterable): Processed messages, as a list or a generator
+
+        Returns:
+            iterator: Text for each block of messages, as strings
+        """
+        return render_blocks(
+            _render_message_block,
+            ((block,) for block, _ in iter_message_blocks(messages)),
+            self.workers,
+        )
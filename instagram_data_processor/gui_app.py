@@ -7,7 +7,12 @@ using CustomTkinter.
 
 import os
 import json
+import logging
+import tempfile
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
@@ -18,6 +23,214 @@ from instagram_data_processor.media_extractor import MediaExtractor
 from instagram_data_processor.exporters import TxtExporter, HTMLExporter, PDFExporter, ExcelExporter
 import instagram_data_processor.utils as utils
 
+logger = logging.getLogger(__name__)
+
+# Parse conversation files with orjson when it is available; it is several
+# times faster than the standard json module, which is kept as a fallback
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Stream very large conversation files with ijson when it is available, so
+# scanning a folder never holds a whole file in memory
+try:
+    import ijson
+    SCAN_ERRORS = (ijson.JSONError, json.JSONDecodeError, UnicodeDecodeError, IOError)
+except ImportError:
+    ijson = None
+    SCAN_ERRORS = (json.JSONDecodeError, UnicodeDecodeError, IOError)
+
+# Size from which conversation files are streamed instead of loaded (32 MB).
+# Instagram splits conversations into files of a few MB, which parse faster
+# in one go
+STREAM_MIN_SIZE = 32 << 20
+
+# Number of threads reading conversation files during a folder scan; reading
+# is mostly waiting on the disk, so more threads than cores pay off
+SCAN_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+# Results of earlier folder scans, so unchanged files are not read again
+SCAN_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "instagram_memory_book", "scan_cache.json")
+
+# Number of files remembered by the scan cache; the files of the oldest scans
+# are forgotten first
+SCAN_CACHE_MAX_ENTRIES = 100000
+
+# Number of leading messages checked for the required fields
+VALIDATED_MESSAGES = 5
+
+def _is_valid_message(msg):
+    """Check that a message has the fields required for processing."""
+    return 'sender_name' in msg and 'timestamp_ms' in msg
+
+def _read_participants(file_path):
+    """
+    Read the participants of a conversation file.
+
+    The file is valid when it has a non-empty list of messages whose first
+    VALIDATED_MESSAGES messages have the required fields.
+
+    Args:
+        file_path (str): Path of the JSON file
+
+    Returns:
+        set: Fixed sender names of the messages, or None if the file is not
+            a valid conversation file
+    """
+    senders = set()
+
+    if ijson is not None and os.path.getsize(file_path) >= STREAM_MIN_SIZE:
+        # Single pass over the messages, one message in memory at a time
+        with open(file_path, 'rb') as f:
+            count = 0
+            for msg in ijson.items(f, 'messages.item'):
+                if count < VALIDATED_MESSAGES and not _is_valid_message(msg):
+                    return None
+                count += 1
+                if 'sender_name' in msg and msg['sender_name']:
+                    senders.add(msg['sender_name'])
+        if not count:
+            return None
+    else:
+        with open(file_path, 'rb') as f:
+            data = _loads(f.read())
+        messages = data.get('messages') if isinstance(data, dict) else None
+        if not (isinstance(messages, list) and messages
+                and all(_is_valid_message(msg) for msg in messages[:VALIDATED_MESSAGES])):
+            return None
+        for msg in messages:
+            if 'sender_name' in msg and msg['sender_name']:
+                senders.add(msg['sender_name'])
+
+    # Fix any broken text in sender names (once per unique name)
+    return {utils.fix_broken_text(sender) for sender in senders}
+
+def _file_fingerprint(entry):
+    """
+    Identify the current version of a file by its modification time and size.
+
+    Args:
+        entry (os.DirEntry): Directory entry of the file
+
+    Returns:
+        list: Modification time in nanoseconds and size, or None if the file
+            cannot be read
+    """
+    try:
+        stat = entry.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _iter_json_files(folder_path):
+    """
+    Find the JSON files in a folder and its subfolders.
+
+    Files are found in the same order as os.walk, but os.scandir's directory
+    entries already tell files from folders, and on Windows carry the
+    modification time and size, without a separate stat call per file.
+    Folders that cannot be read are skipped.
+
+    Args:
+        folder_path (str): Folder to search
+
+    Yields:
+        tuple: Path and fingerprint (see _file_fingerprint) of each JSON file
+    """
+    stack = [folder_path]
+    while stack:
+        subfolders = []
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # Like os.walk, symbolic links to folders are not followed
+                        if not entry.is_symlink():
+                            subfolders.append(entry.path)
+                    elif entry.name.endswith('.json'):
+                        yield entry.path, _file_fingerprint(entry)
+        except OSError:
+            continue
+        # Visit the subfolders in listing order
+        stack.extend(reversed(subfolders))
+
+def _load_scan_cache():
+    """
+    Load the results of earlier folder scans.
+
+    Returns:
+        dict: [fingerprint, participants] by file path, where participants is
+            a sorted list of names, or None for files that are not valid
+            conversation files
+    """
+    try:
+        with open(SCAN_CACHE_FILE, 'r', encoding='utf-8') as f:
+            scan_cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring the folder scan cache: %s", e)
+        return {}
+    if not isinstance(scan_cache, dict):
+        logger.warning("Ignoring the folder scan cache: unexpected content")
+        return {}
+    return scan_cache
+
+def _update_scan_cache(scan_cache, folder_path, cache_entries):
+    """
+    Replace the cached results for a folder with the results of its scan.
+
+    Files of the folder that the scan did not find are dropped with the old
+    results, and the entries of the oldest scans are dropped beyond
+    SCAN_CACHE_MAX_ENTRIES.
+
+    Args:
+        scan_cache (dict): [fingerprint, participants] by file path
+        folder_path (str): Scanned folder
+        cache_entries (dict): [fingerprint, participants] by file path, for
+            the files found in the folder
+
+    Returns:
+        dict: The updated cache, with the entries of the latest scan last
+    """
+    folder_prefix = os.path.join(folder_path, '')
+    updated = {
+        path: entry for path, entry in scan_cache.items()
+        if not path.startswith(folder_prefix) and path not in cache_entries
+    }
+    updated.update(cache_entries)
+    if len(updated) > SCAN_CACHE_MAX_ENTRIES:
+        updated = dict(islice(updated.items(), len(updated) - SCAN_CACHE_MAX_ENTRIES, None))
+    return updated
+
+def _save_scan_cache(scan_cache):
+    """
+    Save the results of folder scans; a cache that cannot be written is skipped.
+
+    Args:
+        scan_cache (dict): [fingerprint, participants] by file path
+    """
+    temp_path = None
+    try:
+        cache_dir = os.path.dirname(SCAN_CACHE_FILE)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Each save writes its own temporary file, so overlapping scans never
+        # write to the same file; the last one replaced wins
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump(scan_cache, f, ensure_ascii=False)
+        os.replace(temp_path, SCAN_CACHE_FILE)
+    except OSError as e:
+        logger.warning("Could not save the folder scan cache: %s", e)
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
@@ -49,6 +262,7 @@ class InstagramDataProcessorApp(ctk.CTk):
         self.is_analyzing = False
         self.analysis_complete = False
         self.analysis_results = None
+        self.current_scan = None
 
         # Create UI elements
         self._create_ui()
@@ -169,6 +383,10 @@ class InstagramDataProcessorApp(ctk.CTk):
         )
         self.files_label.pack(fill=tk.X)
 
+        # Folder scan progress (only shown while a scan is running)
+        self.scan_progress_bar = ctk.CTkProgressBar(self.files_frame)
+        self.scan_progress_bar.set(0)
+
     def _create_user_input(self):
         """Create the user input section."""
         user_frame = ctk.CTkFrame(self.main_frame)
@@ -391,44 +609,145 @@ class InstagramDataProcessorApp(ctk.CTk):
             self.output_path.set(folder_selected)
 
     def _scan_folder(self):
-        """Scan the selected folder for JSON files and detect participants."""
+        """Start scanning the selected folder in a background thread."""
         folder_path = self.folder_path.get()
         if not folder_path or not os.path.isdir(folder_path):
             return
 
-        # Find all JSON files
-        self.json_files = []
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if file.endswith('.json'):
-                    self.json_files.append(os.path.join(root, file))
+        # Stop a scan of a previously selected folder that is still running
+        self._cancel_scan()
 
-        # Validate JSON files for chat content
+        self.json_files = []
         self.valid_json_files = []
-        all_participants = set()
-
-        for file_path in self.json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if 'messages' in data and isinstance(data['messages'], list):
-                        # Check if messages have required fields
-                        if data['messages'] and all(
-                            'sender_name' in msg and 'timestamp_ms' in msg
-                            for msg in data['messages'][:5]  # Check first 5 messages
-                        ):
-                            self.valid_json_files.append(file_path)
-
-                            # Collect all unique participants
-                            for msg in data['messages']:
-                                if 'sender_name' in msg and msg['sender_name']:
-                                    # Fix any broken text in sender name
-                                    sender = utils.fix_broken_text(msg['sender_name'])
-                                    all_participants.add(sender)
-            except (json.JSONDecodeError, UnicodeDecodeError, IOError):
-                # Skip invalid files
-                continue
 
+        # State shared with the scanning thread, which only ever writes to it;
+        # the UI is updated from the main thread by _update_scan_progress
+        self.current_scan = scan = {
+            'folder_path': folder_path,
+            'cancel': threading.Event(),
+            'scanned': 0,
+            'total': 0,
+            'result': None,
+            'error': None,
+        }
+
+        # Show scan progress
+        self.files_label.configure(text="Scanning folder for conversation files...")
+        self.scan_progress_bar.set(0)
+        self.scan_progress_bar.pack(fill=tk.X, pady=(5, 0))
+
+        threading.Thread(target=self._scan_folder_worker, args=(scan,), daemon=True).start()
+        self._update_scan_progress(scan)
+
+    def _cancel_scan(self):
+        """Stop the running folder scan, if any."""
+        if self.current_scan is not None:
+            self.current_scan['cancel'].set()
+            self.current_scan = None
+        self.scan_progress_bar.pack_forget()
+
+    def _scan_folder_worker(self, scan):
+        """Scan a folder for JSON files and detect participants in a background thread."""
+        try:
+            # Find all JSON files
+            json_entries = list(_iter_json_files(scan['folder_path']))
+            json_files = [file_path for file_path, _ in json_entries]
+            scan['total'] = len(json_files)
+
+            # Validate JSON files for chat content
+            valid_json_files = []
+            all_participants = set()
+
+            # Results of earlier scans, for files that have not changed since
+            scan_cache = _load_scan_cache()
+            cache_entries = {}
+
+            # Files are read in a thread pool, keeping a few files in flight per
+            # thread and handling them in order
+            with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+                pending = deque()
+                entries = iter(json_entries)
+                while True:
+                    if scan['cancel'].is_set():
+                        return
+                    for file_path, fingerprint in islice(entries, 2 * SCAN_WORKERS - len(pending)):
+                        cached = scan_cache.get(file_path)
+                        if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+                            future = None
+                        else:
+                            future = executor.submit(_read_participants, file_path)
+                        pending.append((file_path, fingerprint, future))
+                    if not pending:
+                        break
+
+                    file_path, fingerprint, future = pending.popleft()
+                    if future is None:
+                        participants = scan_cache[file_path][1]
+                    else:
+                        try:
+                            participants = future.result()
+                        except SCAN_ERRORS:
+                            # Skip invalid files
+                            participants = None
+                        except Exception as e:
+                            # Skip files with unexpected content rather than the whole scan
+                            logger.warning("Skipping %s: %s", file_path, e)
+                            participants = None
+                    if participants is not None:
+                        valid_json_files.append(file_path)
+                        # Collect all unique participants
+                        all_participants.update(participants)
+                    if fingerprint is not None:
+                        cache_entries[file_path] = [
+                            fingerprint, sorted(participants) if participants is not None else None
+                        ]
+                    scan['scanned'] += 1
+
+            # Replace the cached results for this folder with the current ones,
+            # unless a newer scan replaced this one and saves its own results
+            scan_cache = _update_scan_cache(scan_cache, scan['folder_path'], cache_entries)
+            if scan['cancel'].is_set():
+                return
+            _save_scan_cache(scan_cache)
+
+            scan['result'] = (json_files, valid_json_files, all_participants)
+
+        except Exception as e:
+            scan['error'] = str(e)
+
+    def _update_scan_progress(self, scan):
+        """Update the folder scan progress, and show the results once it is done."""
+        # A newer scan or a reset replaced this one
+        if scan is not self.current_scan:
+            return
+
+        if scan['error'] is not None:
+            self.current_scan = None
+            self.scan_progress_bar.pack_forget()
+            self.files_label.configure(text=f"Scanning the folder failed: {scan['error']}")
+        elif scan['result'] is None:
+            if scan['total']:
+                self.scan_progress_bar.set(scan['scanned'] / scan['total'])
+                self.files_label.configure(
+                    text=f"Scanning folder... {scan['scanned']}/{scan['total']} JSON file(s)"
+                )
+
+            # Schedule next update
+            self.after(50, self._update_scan_progress, scan)
+        else:
+            self.current_scan = None
+            self.scan_progress_bar.pack_forget()
+            self.json_files, self.valid_json_files, all_participants = scan['result']
+            self._show_scan_results(scan['folder_path'], all_participants)
+
+    def _show_scan_results(self, folder_path, all_participants):
+        """
+        Show the conversation files found by a folder scan and auto-detect participants.
+
+        Args:
+            folder_path (str): Scanned folder
+            all_participants (set): Participants of the valid conversation files
+        """
         # Update UI
         if self.valid_json_files:
             self.files_label.configure(
@@ -489,6 +808,10 @@ class InstagramDataProcessorApp(ctk.CTk):
     def _start_analysis(self):
         """Start the analysis process."""
         # Validate inputs
+        if self.current_scan is not None:
+            self._show_error("The selected folder is still being scanned. Please wait until it has finished.")
+            return
+
         if not self.valid_json_files:
             self._show_error("No valid conversation files found. Please select a different folder.")
             return
@@ -727,6 +1050,7 @@ class InstagramDataProcessorApp(ctk.CTk):
         self.is_analyzing = False
         self.analysis_complete = False
         self.analysis_results = None
+        self._cancel_scan()
         self.json_files = []
         self.valid_json_files = []
 
@@ -21,6 +21,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Always apply the latin1 -> utf-8 conversion to any text that contains
+# common broken encoding characters like ð, Ã, Ø, etc.
+BROKEN_CHARS = ['ð', 'Ã', 'Ø', 'Ù', 'Ú', 'Û', 'Ü', 'Ý', 'Þ', 'ß', 'à', 'á', 'â', 'ã', 'ä', 'å',
+                'æ', 'ç', 'è', 'é', 'ê', 'ë', 'ì', 'í', 'î', 'ï', 'ñ', 'ò', 'ó', 'ô', 'õ', 'ö',
+                '˜', '™', 'š', '›', 'œ', '§', '©', '¯', '°', '±', '²', '³', '´', 'µ', '¶', '·', '¸',
+                '\\x9f', '\\x8f', '\\x9a', '\\x91']  # Add common hex escape sequences
+BROKEN_CHARS_RE = re.compile('|'.join(re.escape(c) for c in BROKEN_CHARS))
+
+# Special handling for emoji patterns
+BROKEN_EMOJI_RE = re.compile(r'ð\x9f[\x80-\xff][\x80-\xff]|\\x9f\\x[\x80-\xff]\\x[\x80-\xff]')
+
+# Characters in file names that are not allowed on common file systems
+UNSAFE_FILENAME_RE = re.compile(r'[\\/*?:"<>|]')
+
+# Directional marks and zero-width characters that cause issues with FPDF
+PDF_STRIP_TABLE = dict.fromkeys(map(ord, [
+    '\u2066',  # Left-to-Right Isolate
+    '\u2067',  # Right-to-Left Isolate
+    '\u2068',  # First Strong Isolate
+    '\u2069',  # Pop Directional Isolate
+    '\u202A',  # Left-to-Right Embedding
+    '\u202B',  # Right-to-Left Embedding
+    '\u202C',  # Pop Directional Formatting
+    '\u202D',  # Left-to-Right Override
+    '\u202E',  # Right-to-Left Override
+    '\u061C',  # Arabic Letter Mark
+    '\u200E',  # Left-to-Right Mark
+    '\u200F',  # Right-to-Left Mark
+    '\u200B',  # Zero Width Space
+    '\u200C',  # Zero Width Non-Joiner
+    '\u200D',  # Zero Width Joiner
+    '\uFEFF',  # Zero Width No-Break Space
+]))
+
 def setup_directories(base_path):
     """
     Create necessary output directories if they don't exist.
@@ -63,25 +97,9 @@ def fix_broken_text(text):
     if not text or not isinstance(text, str):
         return ""
 
-    # Always apply the latin1 -> utf-8 conversion to any text that contains
-    # common broken encoding characters like ð, Ã, Ø, etc.
-    broken_chars = ['ð', 'Ã', 'Ø', 'Ù', 'Ú', 'Û', 'Ü', 'Ý', 'Þ', 'ß', 'à', 'á', 'â', 'ã', 'ä', 'å',
-                    'æ', 'ç', 'è', 'é', 'ê', 'ë', 'ì', 'í', 'î', 'ï', 'ñ', 'ò', 'ó', 'ô', 'õ', 'ö',
-                    '˜', '™', 'š', '›', 'œ', '§', '©', '¯', '°', '±', '²', '³', '´', 'µ', '¶', '·', '¸',
-                    '\\x9f', '\\x8f', '\\x9a', '\\x91']  # Add common hex escape sequences
-
-    # Special handling for emoji patterns
-    emoji_patterns = [r'ð\x9f[\x80-\xff][\x80-\xff]', r'\\x9f\\x[\x80-\xff]\\x[\x80-\xff]']
-
-    # Check for emoji patterns using regex
-    has_emoji_pattern = False
-    for pattern in emoji_patterns:
-        if re.search(pattern, text):
-            has_emoji_pattern = True
-            break
-
-    # Check if text contains any of the broken characters
-    has_broken_chars = any(c in text for c in broken_chars)
+    # Check for emoji patterns and broken encoding characters
+    has_emoji_pattern = BROKEN_EMOJI_RE.search(text) is not None
+    has_broken_chars = BROKEN_CHARS_RE.search(text) is not None
 
     # Try different fixing methods based on what we detected
     if has_emoji_pattern or has_broken_chars:
@@ -254,7 +272,7 @@ def safe_file_name(name):
         str: Safe filename
     """
     # Replace invalid characters with underscore
-    return re.sub(r'[\\/*?:"<>|]', "_", name)
+    return UNSAFE_FILENAME_RE.sub("_", name)
 
 def sanitize_for_pdf(text):
     """
@@ -275,27 +293,7 @@ def sanitize_for_pdf(text):
         text = emoji.replace_emoji(text, replace='[EMOJI]')
 
         # Remove specific problematic characters that cause issues with FPDF
-        problematic_chars = [
-            '\u2066',  # Left-to-Right Isolate
-            '\u2067',  # Right-to-Left Isolate
-            '\u2068',  # First Strong Isolate
-            '\u2069',  # Pop Directional Isolate
-            '\u202A',  # Left-to-Right Embedding
-            '\u202B',  # Right-to-Left Embedding
-            '\u202C',  # Pop Directional Formatting
-            '\u202D',  # Left-to-Right Override
-            '\u202E',  # Right-to-Left Override
-            '\u061C',  # Arabic Letter Mark
-            '\u200E',  # Left-to-Right Mark
-            '\u200F',  # Right-to-Left Mark
-            '\u200B',  # Zero Width Space
-            '\u200C',  # Zero Width Non-Joiner
-            '\u200D',  # Zero Width Joiner
-            '\uFEFF',  # Zero Width No-Break Space
-        ]
-
-        for char in problematic_chars:
-            text = text.replace(char, '')
+        text = text.translate(PDF_STRIP_TABLE)
 
         # For remaining characters, only keep those that can be encoded in latin1
         # which is what standard PDF fonts support
@@ -21,13 +21,14 @@ setup(
     python_requires=">=3.7",
     install_requires=[
         "emoji>=2.2.0",
-        "fpdf2>=2.7.4",
-        "matplotlib>=3.7.1",
-        "numpy>=1.24.3",
+        "fpdf2>=2.7.5",
         "openpyxl>=3.1.2",
+        "XlsxWriter>=3.0.0",
         "pandas>=2.0.1",
         "Pillow>=9.5.0",
         "reportlab>=4.0.4",
+        "ijson>=3.2",
+        "orjson>=3.9",
     ],
     entry_points={
         "console_scripts": [
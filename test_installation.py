@@ -37,8 +37,7 @@ def main():
         "emoji",
         "dateutil",
         "PIL",
-        "fpdf",
-        "matplotlib"
+        "fpdf"
     ]
     
     all_deps_installed = True
@@ -9,6 +9,14 @@ import pytest
 # Add the parent directory to sys.path to allow importing the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# The processor reads the package configuration, which users create from
+# config_sample.py; use the sample itself when none has been created
+try:
+    import instagram_data_processor.config
+except ImportError:
+    import config_sample
+    sys.modules['instagram_data_processor.config'] = config_sample
+
 @pytest.fixture
 def sample_message():
     """
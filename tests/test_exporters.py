@@ -0,0 +1,159 @@
+"""
+Tests for the exporters, fed with messages from the JSON processor.
+"""
+
+import json
+import math
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from instagram_data_processor.json_processor import InstagramDataProcessor
+from instagram_data_processor.exporters import TxtExporter, HTMLExporter, PDFExporter
+from instagram_data_processor.exporters.pdf_exporter import ConversationPDF
+
+
+def _instagram_text(text):
+    """Encode text the way Instagram exports do (UTF-8 bytes read as Latin-1)."""
+    return text.encode('utf-8').decode('latin1')
+
+
+class TestProcessedTextExport(unittest.TestCase):
+    """Test that Arabic and emoji text survives processing and export."""
+
+    ARABIC = "مرحبا كيف حالك"
+    EMOJI = "😊"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.temp_dir.name, "inbox")
+        os.makedirs(data_dir)
+        self.output_dir = os.path.join(self.temp_dir.name, "output")
+        os.makedirs(self.output_dir)
+
+        conversation = {
+            "participants": [{"name": "friend"}, {"name": "me"}],
+            "messages": [
+                {
+                    "sender_name": "friend",
+                    "timestamp_ms": 1609459200000,
+                    "content": _instagram_text(self.ARABIC),
+                },
+                {
+                    "sender_name": "me",
+                    "timestamp_ms": 1609459260000,
+                    "content": _instagram_text(f"Hello {self.EMOJI}"),
+                },
+            ],
+        }
+        with open(os.path.join(data_dir, "message_1.json"), 'w', encoding='utf-8') as f:
+            json.dump(conversation, f)
+
+        processor = InstagramDataProcessor(data_dir, "friend", "me")
+        self.messages = processor.process_json_files()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_txt_export(self):
+        """Test that the text export contains the Arabic and emoji text."""
+        filepath = TxtExporter(self.output_dir).export(self.messages, "friend", "me")
+        with open(filepath, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+        self.assertIn(f"friend: {self.ARABIC}", text)
+        self.assertIn(f"me: Hello {self.EMOJI}", text)
+
+    def test_html_export(self):
+        """Test that the HTML export contains the Arabic and emoji text."""
+        filepath = HTMLExporter(self.output_dir).export(self.messages, "friend", "me")
+        with open(filepath, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        self.assertIn(f'<div class="message-content arabic-text">{self.ARABIC}</div>', html)
+        self.assertIn(f"Hello {self.EMOJI}", html)
+
+
+class TestParallelExport(unittest.TestCase):
+    """Test that rendering in worker processes does not change the export."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # Each day has 300 messages, so days span the blocks of 1000 messages
+        self.messages = [
+            {
+                "date": f"2021-01-{i // 300 + 1:02d}",
+                "time": f"{i // 60 % 24:02d}:{i % 60:02d}",
+                "sender": "friend" if i % 3 else "me",
+                "content": f"Message {i}",
+                "photos": [],
+                "videos": [],
+                "audio": [],
+                "emoji_count": 0,
+                "emojis": [],
+                "reactions": [{"actor": "friend", "reaction": "❤"}] if i % 7 == 0 else [],
+            }
+            for i in range(2500)
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _export(self, name, workers):
+        """Export the messages to HTML and return the page as bytes."""
+        output_dir = os.path.join(self.temp_dir.name, name)
+        os.makedirs(output_dir)
+        filepath = HTMLExporter(output_dir, workers=workers).export(self.messages, "friend", "me")
+        with open(filepath, 'rb') as f:
+            return f.read()
+
+    def test_html_export_with_workers(self):
+        """Test that the HTML export is the same with and without workers."""
+        serial = self._export("serial", 1)
+        parallel = self._export("parallel", 2)
+
+        self.assertEqual(parallel, serial)
+        # Each day is introduced once, also when it spans two blocks
+        self.assertEqual(serial.count(b'<div class="date-separator">'), 9)
+
+
+class TestMessageDistributionChart(unittest.TestCase):
+    """Test the pie chart of the PDF statistics page."""
+
+    def test_labels_are_on_their_slices(self):
+        """Test that each percentage is drawn inside its own slice."""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        pdf = ConversationPDF("Chart", "me")
+        pdf.add_page()
+        stats = {'messages_by_sender': {"me": 75, "friend": 25}}
+
+        with mock.patch.object(pdf, 'solid_arc', wraps=pdf.solid_arc) as solid_arc, \
+                mock.patch.object(pdf, 'text', wraps=pdf.text) as text:
+            PDFExporter(temp_dir.name)._add_message_distribution_chart(pdf, stats)
+
+        slices = [arc.args for arc in solid_arc.call_args_list]
+        labels = [label.args for label in text.call_args_list if label.args[2].endswith('%')]
+        self.assertEqual([label[2] for label in labels], ["75.0%", "25.0%"])
+        self.assertEqual(len(slices), 2)
+
+        left, top, diameter = slices[0][:3]
+        center_x, center_y = left + diameter / 2, top + diameter / 2
+        for (_, _, _, start, end), (x, y, percent) in zip(slices, labels):
+            # Middle of the label text, and its angle as fpdf2 measures it on
+            # the page: the arc goes from start to end with growing angles
+            x += pdf.get_string_width(percent) / 2
+            y -= 1.5
+            label_angle = math.degrees(math.atan2(y - center_y, x - center_x))
+            self.assertLess((label_angle - start) % 360, (end - start) % 360, percent)
+
+        # Slices go counterclockwise from 12 o'clock, so the last, smaller one
+        # spans from 3 o'clock to 12 o'clock: its label is at the top right
+        x, y, _ = labels[1]
+        self.assertGreater(x, center_x)
+        self.assertLess(y, center_y)
+
+
+if __name__ == '__main__':
+    unittest.main()
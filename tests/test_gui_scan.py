@@ -0,0 +1,271 @@
+"""
+Tests for the folder scan of the GUI application.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+try:
+    from instagram_data_processor import gui_app
+except ImportError:  # Tk or CustomTkinter is not available
+    gui_app = None
+
+
+def _write_conversation(file_path, senders):
+    """Write a conversation file with one message per sender."""
+    messages = [
+        {"sender_name": sender, "timestamp_ms": 1609459200000 + i, "content": "hi"}
+        for i, sender in enumerate(senders)
+    ]
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({"participants": [], "messages": messages}, f)
+
+
+def _scan(folder_path):
+    """Run a folder scan the way the application does, in the current thread."""
+    scan = {
+        'folder_path': folder_path,
+        'cancel': threading.Event(),
+        'scanned': 0,
+        'total': 0,
+        'result': None,
+        'error': None,
+    }
+    gui_app.InstagramDataProcessorApp._scan_folder_worker(None, scan)
+    return scan
+
+
+@unittest.skipIf(gui_app is None, "the GUI dependencies are not installed")
+class TestScanCache(unittest.TestCase):
+    """Test cases for the folder scan cache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, "inbox")
+        os.makedirs(self.folder)
+        self.conversation = os.path.join(self.folder, "message_1.json")
+        _write_conversation(self.conversation, ["alice", "bob"])
+
+        self.cache_file = os.path.join(self.temp_dir.name, "cache", "scan_cache.json")
+        patcher = mock.patch.object(gui_app, 'SCAN_CACHE_FILE', self.cache_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _scan_counting_reads(self):
+        """Scan the folder, returning the scan and the number of files read."""
+        with mock.patch.object(gui_app, '_read_participants', wraps=gui_app._read_participants) as read:
+            scan = _scan(self.folder)
+        self.assertIsNone(scan['error'])
+        return scan, read.call_count
+
+    def test_unchanged_file_is_not_read_again(self):
+        """Test that a second scan takes the participants from the cache."""
+        first, reads = self._scan_counting_reads()
+        self.assertEqual(reads, 1)
+
+        second, reads = self._scan_counting_reads()
+        self.assertEqual(reads, 0)
+        self.assertEqual(second['result'], first['result'])
+        self.assertEqual(second['result'][2], {"alice", "bob"})
+
+    def test_file_changed_in_size_is_read_again(self):
+        """Test that a file whose size changed is read again."""
+        self._scan_counting_reads()
+        _write_conversation(self.conversation, ["alice", "bob", "carol"])
+
+        scan, reads = self._scan_counting_reads()
+        self.assertEqual(reads, 1)
+        self.assertEqual(scan['result'][2], {"alice", "bob", "carol"})
+
+    def test_file_changed_in_mtime_is_read_again(self):
+        """Test that a file whose modification time changed is read again."""
+        self._scan_counting_reads()
+        # Same size, different content and modification time
+        _write_conversation(self.conversation, ["alice", "dave"])
+        stat = os.stat(self.conversation)
+        os.utime(self.conversation, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        scan, reads = self._scan_counting_reads()
+        self.assertEqual(reads, 1)
+        self.assertEqual(scan['result'][2], {"alice", "dave"})
+
+    def test_corrupt_cache_file_is_ignored(self):
+        """Test that a corrupt cache file is ignored and replaced."""
+        os.makedirs(os.path.dirname(self.cache_file))
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            f.write('{"truncated": ')
+
+        with self.assertLogs(gui_app.logger, level='WARNING'):
+            scan, reads = self._scan_counting_reads()
+        self.assertEqual(reads, 1)
+        self.assertEqual(scan['result'][2], {"alice", "bob"})
+
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            self.assertIn(self.conversation, json.load(f))
+
+    def _cached_paths(self):
+        """Return the file paths in the saved cache."""
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            return list(json.load(f))
+
+    def test_removed_files_are_pruned(self):
+        """Test that files removed from the scanned folder are dropped from the cache."""
+        removed = os.path.join(self.folder, "message_2.json")
+        _write_conversation(removed, ["erin"])
+        other_folder = os.path.join(self.temp_dir.name, "other")
+        os.makedirs(other_folder)
+        other_conversation = os.path.join(other_folder, "message_1.json")
+        _write_conversation(other_conversation, ["frank"])
+        _scan(other_folder)
+        self._scan_counting_reads()
+
+        os.remove(removed)
+        self._scan_counting_reads()
+
+        # Only the scanned folder is pruned; other folders keep their entries
+        self.assertEqual(self._cached_paths(), [other_conversation, self.conversation])
+
+    def test_cache_size_is_capped(self):
+        """Test that the entries of the oldest scans are dropped beyond the cap."""
+        scan_cache = {"old": [[0, 0], None]}
+        cache_entries = {self.conversation: [[1, 1], ["alice"]]}
+        with mock.patch.object(gui_app, 'SCAN_CACHE_MAX_ENTRIES', 1):
+            updated = gui_app._update_scan_cache(scan_cache, self.folder, cache_entries)
+        self.assertEqual(updated, cache_entries)
+
+    def test_cancelled_scan_does_not_save(self):
+        """Test that a scan cancelled once its files are read leaves the cache alone."""
+        scan = {
+            'folder_path': self.folder,
+            'cancel': threading.Event(),
+            'scanned': 0,
+            'total': 0,
+            'result': None,
+            'error': None,
+        }
+
+        update = gui_app._update_scan_cache
+
+        def update_scan_cache(*args):
+            # The scan is cancelled after its files are read
+            scan['cancel'].set()
+            return update(*args)
+
+        with mock.patch.object(gui_app, '_update_scan_cache', side_effect=update_scan_cache):
+            gui_app.InstagramDataProcessorApp._scan_folder_worker(None, scan)
+
+        self.assertIsNone(scan['error'])
+        self.assertIsNone(scan['result'])
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_saves_use_their_own_temporary_file(self):
+        """Test that each save writes a temporary file of its own, leaving none behind."""
+        with mock.patch.object(gui_app.tempfile, 'mkstemp', wraps=gui_app.tempfile.mkstemp) as mkstemp:
+            self._scan_counting_reads()
+            self._scan_counting_reads()
+
+        cache_dir = os.path.dirname(self.cache_file)
+        self.assertEqual(mkstemp.call_count, 2)
+        for call in mkstemp.call_args_list:
+            self.assertEqual(call.kwargs['dir'], cache_dir)
+        self.assertEqual(os.listdir(cache_dir), ["scan_cache.json"])
+
+
+@unittest.skipIf(gui_app is None, "the GUI dependencies are not installed")
+class TestFolderScan(unittest.TestCase):
+    """Test cases for finding and validating the conversation files of a folder."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.temp_dir.name, "inbox")
+        os.makedirs(self.folder)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, relative_path, content):
+        """Write a file under the scanned folder and return its path."""
+        file_path = os.path.join(self.folder, relative_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        return file_path
+
+    def test_files_are_found_in_os_walk_order(self):
+        """Test that JSON files are found in the same order as os.walk."""
+        for relative_path in [
+            "b/message_1.json", "a/message_2.json", "a/message_1.json",
+            "a/nested/deeper/message_1.json", "c/photos/notes.txt",
+            "message_1.json", "c/message_1.json",
+        ]:
+            self._write(relative_path, b"{}")
+
+        expected = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(self.folder)
+            for name in files if name.endswith('.json')
+        ]
+        found = [file_path for file_path, _ in gui_app._iter_json_files(self.folder)]
+        self.assertEqual(found, expected)
+
+    def test_unreadable_folders_are_skipped(self):
+        """Test that folders which cannot be listed are skipped."""
+        readable = self._write("a/message_1.json", b"{}")
+        self._write("b/message_1.json", b"{}")
+        unreadable = os.path.join(self.folder, "b")
+
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if path == unreadable:
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        with mock.patch.object(gui_app.os, 'scandir', side_effect=scandir):
+            found = [file_path for file_path, _ in gui_app._iter_json_files(self.folder)]
+        self.assertEqual(found, [readable])
+
+    def test_invalid_files_are_dropped(self):
+        """Test that invalid and non-conversation files are dropped, not raised."""
+        valid = self._write("valid/message_1.json", json.dumps({
+            "messages": [{"sender_name": "alice", "timestamp_ms": 1609459200000}],
+        }).encode('utf-8'))
+        for relative_path, content in [
+            ("invalid/message_1.json", b"not json"),
+            ("truncated/message_1.json", b'{"messages": [{"sender_name": "al'),
+            ("binary/message_1.json", b"\xff\xfe\x00\x01"),
+            ("empty/message_1.json", b""),
+            ("list/message_1.json", b"[1, 2]"),
+            ("settings/message_1.json", b'{"theme": "dark"}'),
+            ("no_messages/message_1.json", b'{"messages": []}'),
+            ("missing_fields/message_1.json", b'{"messages": [{"content": "hi"}]}'),
+            ("not_objects/message_1.json", b'{"messages": [1, "two", null]}'),
+        ]:
+            self._write(relative_path, content)
+
+        # Files are either loaded at once or streamed with ijson, by size
+        branches = [("loaded", 1 << 62)]
+        if gui_app.ijson is not None:
+            branches.append(("streamed", 0))
+        for branch, stream_min_size in branches:
+            with self.subTest(branch=branch), \
+                    mock.patch.object(gui_app, 'STREAM_MIN_SIZE', stream_min_size), \
+                    mock.patch.object(gui_app, 'SCAN_CACHE_FILE',
+                                      os.path.join(self.temp_dir.name, branch, "scan_cache.json")):
+                scan = _scan(self.folder)
+                self.assertIsNone(scan['error'])
+                json_files, valid_json_files, participants = scan['result']
+                self.assertEqual(len(json_files), 10)
+                self.assertEqual(valid_json_files, [valid])
+                self.assertEqual(participants, {"alice"})
+
+
+if __name__ == '__main__':
+    unittest.main()